@@ -0,0 +1,82 @@
+from PyQt6.QtWidgets import QDialog, QFormLayout, QHBoxLayout, QComboBox, QLabel, QPushButton, QCompleter, QMessageBox
+from PyQt6.QtCore import Qt, pyqtSlot
+from functions.store import get_store
+from functions.schema import PRIMARY_KEYS, FIELDS
+from functions.validation import validate_value, REFERENCE_FIELDS
+from functions.reference_cache import get_reference_cache
+from functions.profiling import profiled
+
+class BatchEdit(QDialog):
+    def __init__(self, file_path, keys, main_window):
+        super().__init__(main_window)
+        self.file_path = file_path
+        self.keys = keys
+        self.main_window = main_window
+        self.setWindowTitle(f"Edit {len(keys)} records")
+
+        # the key column can't be set to one value on several rows
+        self.fieldBox = QComboBox(self)
+        self.fieldBox.addItems([field for field in FIELDS[file_path] if field != PRIMARY_KEYS[file_path]])
+
+        self.valueBox = QComboBox(self)
+        self.valueBox.setEditable(True)
+        self.valueBox.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.completer = QCompleter(self)
+        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.valueBox.setCompleter(self.completer)
+
+        self.errorLabel = QLabel(self)
+        self.errorLabel.setStyleSheet("color: red;")
+        self.errorLabel.hide()
+
+        self.applyButton = QPushButton("Apply", self)
+        self.applyButton.setDefault(True)
+        self.applyButton.clicked.connect(self.apply)
+        self.cancelButton = QPushButton("Cancel", self)
+        self.cancelButton.clicked.connect(self.reject)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(self.cancelButton)
+        buttons.addWidget(self.applyButton)
+
+        layout = QFormLayout(self)
+        layout.addRow("Field", self.fieldBox)
+        layout.addRow("New value", self.valueBox)
+        layout.addRow(self.errorLabel)
+        layout.addRow(buttons)
+
+        self.fieldBox.currentTextChanged.connect(self.field_changed)
+        self.field_changed(self.fieldBox.currentText())
+
+    def field_changed(self, field):
+        # offer the values already in use; codes come from the table they point at
+        reference_file = REFERENCE_FIELDS.get(field)
+        if reference_file:
+            entry = get_reference_cache().get(reference_file, PRIMARY_KEYS[reference_file])
+        else:
+            entry = get_reference_cache().get(self.file_path, field)
+
+        self.valueBox.setModel(entry.choices)
+        self.completer.setModel(entry.completions)
+        self.valueBox.setCurrentIndex(0)
+        self.errorLabel.hide()
+
+    @pyqtSlot()
+    @profiled("batch_edit")
+    def apply(self):
+        field = self.fieldBox.currentText()
+        value, error = validate_value(field, self.valueBox.currentText(), get_store())
+        if error:
+            self.errorLabel.setText(error)
+            self.errorLabel.show()
+            return
+
+        changes = get_store().update_many(self.file_path, self.keys, field, value)
+        if changes is None:
+            QMessageBox.warning(self, "Error", "Failed to save changes")
+            return
+
+        self.main_window.apply_changes(changes)
+        QMessageBox.information(self, "Success", f"Updated {len(changes)} of {len(self.keys)} records")
+        self.accept()
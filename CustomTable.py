@@ -1,20 +1,44 @@
-from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QPushButton, QMenu
-from PyQt6.QtCore import QPoint
+from PyQt6.QtWidgets import QTableView, QMenu, QStyledItemDelegate, QStyleOptionButton, QStyle
+from PyQt6.QtCore import Qt, QEvent, QRect
 from functions.edit import EditEntry
-from functions.delete import delete_row_from_table
+from functions.delete import delete_row_from_table, delete_rows_from_table
+from functions.profiling import profiled
 
-class CustomTable(QTableWidget):
+class CustomTable(QTableView):
     def __init__(self, parent=None, file_path=""):
         super().__init__(parent)
 
         self.file_path = file_path
         self.main_window = None
+        self.track_hover()
 
-        self.itemChanged.connect(self.add_option_buttons)
+    def track_hover(self):
+        # the row under the pointer is painted highlighted; selecting it would replace a multi-row selection
+        self.hovered_row = -1
+        self.hover_delegate = HoverDelegate(self)
+        self.setItemDelegate(self.hover_delegate)
 
-    def show_options_menu(self, button, row):
+    def hover_row(self, row):
+        if row != self.hovered_row:
+            self.hovered_row = row
+            self.viewport().update()
 
-        menu = QMenu(button)
+    def leaveEvent(self, event):
+        super().leaveEvent(event)
+        self.hover_row(-1)
+
+    def source_model(self):
+        return self.model().sourceModel()
+
+    @profiled("set_options_column")
+    def set_options_column(self):
+        if not hasattr(self, "options_delegate"):
+            self.options_delegate = OptionsDelegate(self)
+        self.setItemDelegateForColumn(self.model().columnCount() - 1, self.options_delegate)
+
+    def show_options_menu(self, row, pos):
+
+        menu = QMenu(self)
         menu.setStyleSheet("""
             QMenu {
                 background-color: white;
@@ -27,34 +51,88 @@ class CustomTable(QTableWidget):
                 background-color: rgba(0, 0, 0, 0.1);
             }
         """)
-        
-        unique_id = self.item(row, 0).text() if self.item(row, 0) else None
 
-        if unique_id:
+        model = self.source_model()
+        unique_id = model.row_values(row)[0] if 0 <= row < model.rowCount() else None
+
+        # the menu acts on the whole selection when the clicked row is part of it
+        selected = self.selected_rows()
+        if unique_id and row in selected and len(selected) > 1:
+            unique_ids = [model.row_values(selected_row)[model.key_column] for selected_row in selected]
+            menu.addAction(f"Edit {len(unique_ids)} selected...", lambda: self.main_window.open_batch_edit(self, unique_ids))
+            menu.addAction(f"Delete {len(unique_ids)} selected", lambda: delete_rows_from_table(self.main_window, self.file_path, unique_ids))
+
+            menu.exec(pos)
+        elif unique_id:
             parent_window = self.window()
             menu.addAction("Edit", lambda: parent_window.open_edit_dialogue(self, row))
             menu.addAction("Delete", lambda: delete_row_from_table(self.main_window, self.file_path, unique_id, row))
 
-            pos = button.mapToGlobal(QPoint(0, button.height()))
             menu.exec(pos)
-        
-    def add_option_buttons(self):
-        for row in range(self.rowCount()):
-            self.removeCellWidget(row, self.columnCount() - 1) 
-            options_button = QPushButton("⋮")
-            options_button.setFixedSize(35, 35)
-            options_button.clicked.connect(lambda _, t=self, b=options_button, r=row: t.show_options_menu(b, r))
-
-            self.setCellWidget(row, self.columnCount() - 1, options_button)
-                
+
+    def selected_rows(self):
+        # source rows of the selected view rows
+        proxy = self.model()
+        return sorted(proxy.mapToSource(index).row() for index in self.selectionModel().selectedRows())
+
     def get_row_data(self, row):
-        row_data = {}
-        
-        for col in range(self.columnCount()):
-            header_item = self.horizontalHeaderItem(col)
-            if header_item:
-                column_name = header_item.text() 
-                cell_item = self.item(row, col)
-                row_data[column_name] = cell_item.text() if cell_item else ""
-
-        return row_data
\ No newline at end of file
+        model = self.source_model()
+        return dict(zip(model.header, model.row_values(row)))
+
+
+class HoverDelegate(QStyledItemDelegate):
+    def __init__(self, table):
+        super().__init__(table)
+        self.table = table
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        # every cell of the row counts as hovered, so the stylesheet's item:hover colours the whole row
+        if index.row() == self.table.hovered_row:
+            option.state |= QStyle.StateFlag.State_MouseOver
+
+
+class OptionsDelegate(QStyledItemDelegate):
+    BUTTON_SIZE = 35
+
+    def __init__(self, table):
+        super().__init__(table)
+        self.table = table
+
+    def button_rect(self, cell_rect):
+        size = min(self.BUTTON_SIZE, cell_rect.width(), cell_rect.height())
+        rect = QRect(0, 0, size, size)
+        rect.moveCenter(cell_rect.center())
+        return rect
+
+    @profiled("options.paint")
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = self.button_rect(option.rect)
+        button.text = "⋮"
+        button.state = QStyle.StateFlag.State_Enabled
+
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            button.state |= QStyle.StateFlag.State_MouseOver
+
+        self.table.style().drawControl(QStyle.ControlElement.CE_PushButton, button, painter, self.table)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease) or event.button() != Qt.MouseButton.LeftButton:
+            return False
+
+        rect = self.button_rect(option.rect)
+        if not rect.contains(event.position().toPoint()):
+            return False
+
+        # pressing the button keeps the current selection so the menu can act on it
+        if event.type() == QEvent.Type.MouseButtonPress:
+            return True
+
+        # rows can't be edited until every table has finished loading
+        if self.table.main_window.loading:
+            return True
+
+        source_row = self.table.model().mapToSource(index).row()
+        self.table.show_options_menu(source_row, self.table.viewport().mapToGlobal(rect.bottomLeft()))
+        return True
@@ -0,0 +1,82 @@
+from PyQt6.QtWidgets import QWidget, QGridLayout, QVBoxLayout, QGroupBox, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+from PyQt6.QtCore import Qt
+from functions.store import get_store
+from functions.aggregates import STUDENTS, PROGRAMS
+from functions.schema import NULL
+from functions.profiling import profiled
+
+class Dashboard(QWidget):
+    # (title, aggregate attribute, what a NULL value stands for)
+    BREAKDOWNS = [
+        ("Students per program", "by_program", "No program"),
+        ("Students per college", "by_college", "No college"),
+        ("Students per year level", "by_year", None),
+        ("Students per gender", "by_gender", None),
+    ]
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+
+        self.summary = QLabel(self)
+        self.summary.setWordWrap(True)
+
+        grid = QGridLayout()
+        self.tables = {}
+        for position, (title, attribute, _) in enumerate(self.BREAKDOWNS):
+            box = QGroupBox(title, self)
+            table = QTableWidget(0, 2, box)
+            table.setHorizontalHeaderLabels(["", "Students"])
+            table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+            table.verticalHeader().hide()
+            table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            table.horizontalHeader().setSortIndicator(1, Qt.SortOrder.DescendingOrder)
+            layout = QVBoxLayout(box)
+            layout.addWidget(table)
+            grid.addWidget(box, position // 2, position % 2)
+            self.tables[attribute] = table
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.summary)
+        layout.addLayout(grid)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def ready(self):
+        return {STUDENTS, PROGRAMS} <= self.main_window.loaded
+
+    @profiled("dashboard.refresh")
+    def refresh(self):
+        if not self.isVisible():
+            return
+
+        # the counts need both tables; they load in the background like any other tab
+        if not self.ready():
+            for file_path in (STUDENTS, PROGRAMS):
+                self.main_window.load_table(file_path)
+            self.summary.setText("Loading...")
+            return
+
+        aggregates = get_store().aggregates.ensure_built()
+
+        self.summary.setText(
+            f"{aggregates.students} students in {len(aggregates.program_college)} programs. "
+            f"{aggregates.without_program()} students have no program, "
+            f"{aggregates.dangling} point at a program that no longer exists, "
+            f"and {aggregates.programs_without_college()} programs have no college.")
+
+        for title, attribute, null_label in self.BREAKDOWNS:
+            self.fill(self.tables[attribute], getattr(aggregates, attribute), null_label)
+
+    def fill(self, table, counts, null_label):
+        table.setSortingEnabled(False)
+        table.setRowCount(len(counts))
+        for row, (value, count) in enumerate(counts.most_common()):
+            label = null_label if value == NULL and null_label else value
+            count_item = QTableWidgetItem()
+            count_item.setData(Qt.ItemDataRole.DisplayRole, count)
+            table.setItem(row, 0, QTableWidgetItem(label))
+            table.setItem(row, 1, count_item)
+        table.setSortingEnabled(True)
@@ -1,15 +1,27 @@
-from PyQt6.QtWidgets import QMainWindow, QComboBox, QHeaderView, QTableWidget, QMessageBox
-from PyQt6.QtCore import Qt, QCoreApplication
+from PyQt6.QtWidgets import QMainWindow, QComboBox, QHeaderView, QTableView, QMessageBox, QFileDialog, QProgressBar
+from PyQt6.QtCore import Qt, QCoreApplication, QTimer, QFileSystemWatcher, pyqtSlot
+from PyQt6.QtGui import QShortcut, QKeySequence
 from PyQt6.QtGui import QIcon
-from PyQt6 import uic
-from functions.load import load_data
+from functions.load import load_data_in_background
+from functions.save import SaveNotifier
+from functions.ui_loader import load_ui
 from CustomTable import CustomTable
+from TableModel import TableModel, FilterProxyModel
 from functions.edit import EditEntry
+from functions.store import get_store
+from functions.query import compile_query, QueryError
+from functions.search_index import GRAM_SIZE
+from functions.journal import INSERT, DELETE
+from functions.import_csv import read_import, commit_import, format_errors
+from functions.profiling import profiled
+from ProfilerPanel import ProfilerPanel
+from BatchEdit import BatchEdit
+from Dashboard import Dashboard
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        uic.loadUi("ui/mainWindow.ui", self)
+        load_ui("ui/mainWindow.ui", self)
         
         self.studentsData = []
         self.programsData = []
@@ -22,51 +34,287 @@ class MainWindow(QMainWindow):
             table.__class__ = CustomTable
             table.file_path = path
             table.main_window = self
+            table.track_hover()
+
+            model = TableModel(table)
+            proxy = FilterProxyModel(table)
+            proxy.setSourceModel(model)
+            proxy.modelReset.connect(table.set_options_column)
+            table.setModel(proxy)
+            table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
         
-        try:
-            load_data(self)
-        except Exception as e:
-            self.show_error(f"An error occurred while loading data: {e}")
-        
-        headers = self.get_current_table_headers()
-        self.populate_combo_boxes(headers)
-        
-        self.display_counter()
         self.set_custom_column_widths()
         
+        self.dashboard = Dashboard(self)
+        self.tabWidget.addTab(self.dashboard, "Dashboard")
+        
         for table in self.table_widgets:    
-            table.cellEntered.connect(lambda row, _: self.highlight_row(row))
+            table.entered.connect(lambda index, table=table: table.hover_row(index.row()))
         
+        self.addButton.addItem("Import CSV...")
         self.addButton.setCurrentIndex(0)
         self.addButton.currentIndexChanged.connect(self.open_add_dialogue)
         
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(150)
+        self.searchTimer.timeout.connect(self.search_table)
+        
+        self.searchInput.textChanged.connect(self.search_typed)
         self.searchInput.returnPressed.connect(self.search_table)
         self.searchBy.currentIndexChanged.connect(self.search_table)
         
         self.sortOrder.currentIndexChanged.connect(self.sort_table)
         
         self.tabWidget.currentChanged.connect(self.tab_changed)
+        
+        # not in any menu, for looking into slow operations
+        self.profilerShortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.profilerShortcut.activated.connect(self.open_profiler_panel)
+        
+        self.start_loading()
+        self.watch_files()
+        
+        # saving happens in the background; only its outcome is shown
+        self.saveNotifier = SaveNotifier(get_store().writer, self)
+        self.saveNotifier.saved.connect(lambda file_paths, message: self.statusBar().showMessage(message, 3000))
+        self.saveNotifier.failed.connect(self.save_failed)
 
-    def display_counter(self):
-        self.studentCount.setText(f"Number of Students: {self.studentsTable.rowCount()}")
-        self.programCount.setText(f"Number of Programs: {self.programsTable.rowCount()}")
-        self.collegeCount.setText(f"Number of Colleges: {self.collegesTable.rowCount()}")
+    def start_loading(self):
+        self.loading = False
+        self.load_errors = []
+        self.loadedRows = 0
+        
+        # tables shown in full, tables still streaming in, and every loader started so far
+        self.loaded = set()
+        self.loading_files = set()
+        self.loaders = {}
+        
+        self.loadingControls = [self.addButton, self.searchInput, self.searchBy, self.sortBy, self.sortOrder]
+        # only make sense on a table tab
+        self.tableControls = [self.searchInput, self.searchBy, self.sortBy, self.sortOrder]
+        
+        self.loadProgress = QProgressBar(self)
+        self.loadProgress.setRange(0, 0)
+        self.loadProgress.setMaximumWidth(200)
+        self.statusBar().addPermanentWidget(self.loadProgress)
+        self.loadProgress.hide()
+        
+        # the other tabs load the first time they are opened
+        self.load_table(self.get_current_table().file_path)
+        self.display_counter()
+
+    def load_table(self, file_path):
+        if file_path in self.loaded or file_path in self.loading_files:
+            return
+        
+        self.loading = True
+        self.loading_files.add(file_path)
+        for control in self.loadingControls:
+            control.setEnabled(False)
+        
+        self.loadProgress.show()
+        self.statusBar().showMessage("Loading...")
         
+        self.loaders[file_path] = load_data_in_background(self, [file_path])
+
+    def watch_files(self):
+        self.changedFiles = set()
+        self.fileWatcher = QFileSystemWatcher(self)
+        if get_store().storage.watchable:
+            self.fileWatcher.addPaths(self.file_paths)
+        self.fileWatcher.fileChanged.connect(self.file_changed)
+        
+        # scripts often write a file in several steps, so wait for them to settle
+        self.syncTimer = QTimer(self)
+        self.syncTimer.setSingleShot(True)
+        self.syncTimer.setInterval(300)
+        self.syncTimer.timeout.connect(self.sync_files)
+
+    def file_changed(self, file_path):
+        self.changedFiles.add(file_path)
+        self.syncTimer.start()
+
+    @pyqtSlot()
+    @profiled("sync_files")
+    def sync_files(self):
+        file_paths, self.changedFiles = self.changedFiles, set()
+        
+        for file_path in sorted(file_paths):
+            # replacing a file drops it from the watcher
+            if file_path not in self.fileWatcher.files():
+                self.fileWatcher.addPath(file_path)
+            
+            # the load may have read the file before the change; finish_table_load syncs it after
+            if file_path in self.loading_files:
+                self.changedFiles.add(file_path)
+                continue
+            
+            try:
+                changes = get_store().sync(file_path)
+            except Exception as e:
+                print(f"Error reading changes to {file_path}: {str(e)}")
+                continue
+            
+            if changes is None:
+                self.get_table(file_path).source_model().set_rows([], [])
+                self.loaded.discard(file_path)
+                current = self.get_current_table()
+                if current is not None and file_path == current.file_path:
+                    self.load_table(file_path)
+            elif changes:
+                self.apply_changes(changes)
+                self.statusBar().showMessage(f"{file_path} changed on disk, updated {len(changes)} rows", 5000)
+        
+        self.display_counter()
+
+    def add_loaded_rows(self, file_path, header, rows):
+        table = self.get_table(file_path)
+        model = table.source_model()
+        
+        if not model.header:
+            model.set_rows(header, rows)
+            self.set_custom_column_widths()
+            if table == self.get_current_table():
+                self.populate_combo_boxes(self.get_current_table_headers())
+        else:
+            model.append_rows(rows)
+        
+        self.loadedRows += len(rows)
+        self.statusBar().showMessage(f"Loading... {self.loadedRows} rows")
+        self.display_counter()
+
+    def finish_table_load(self, file_path, changed):
+        records = get_store().table(file_path)
+        table = self.get_table(file_path)
+        
+        if changed:
+            table.source_model().set_rows(list(records.header), list(records.rows.values()))
+            self.set_custom_column_widths()
+            self.display_counter()
+        records.prepare_search()
+        self.loaded.add(file_path)
+        
+        data = {"data/students.csv": "studentsData", "data/programs.csv": "programsData", "data/colleges.csv": "collegesData"}
+        setattr(self, data[file_path], table.source_model().rows)
+        self.dashboard.refresh()
+        
+        if file_path in self.changedFiles or get_store().storage.changed_on_disk(file_path):
+            self.file_changed(file_path)
+
+    def save_failed(self, file_paths, message):
+        # rejected changes are dropped from the store, so show its tables again
+        for file_path in file_paths:
+            if file_path in self.loaded and file_path not in get_store().tables:
+                self.finish_table_load(file_path, True)
+        self.show_error(message)
+
+    def report_load_error(self, file_path, message):
+        self.load_errors.append(f"{file_path}: {message}")
+
+    def finish_loading(self, file_paths):
+        self.loading_files.difference_update(file_paths)
+        self.display_counter()
+        if self.loading_files:
+            return
+        
+        self.loading = False
+        self.loadedRows = 0
+        
+        on_table = self.get_current_table() is not None
+        for control in self.loadingControls:
+            control.setEnabled(on_table or control not in self.tableControls)
+        
+        self.loadProgress.hide()
+        self.statusBar().clearMessage()
+        
+        if self.load_errors:
+            self.show_error("An error occurred while loading data:\n" + "\n".join(self.load_errors))
+            self.load_errors = []
+
+    def open_profiler_panel(self):
+        if not hasattr(self, "profilerPanel"):
+            self.profilerPanel = ProfilerPanel(self)
+        self.profilerPanel.refresh()
+        self.profilerPanel.show()
+        self.profilerPanel.raise_()
+
+    def closeEvent(self, event):
+        for thread, _ in self.loaders.values():
+            if thread.isRunning():
+                thread.requestInterruption()
+                thread.quit()
+                thread.wait()
+        self.saveNotifier.detach()
+        get_store().close()
+        super().closeEvent(event)
+
+    def display_counter(self):
+        self.studentCount.setText(f"Number of Students: {self.row_count('data/students.csv')}")
+        self.programCount.setText(f"Number of Programs: {self.row_count('data/programs.csv')}")
+        self.collegeCount.setText(f"Number of Colleges: {self.row_count('data/colleges.csv')}")
+
+    def row_count(self, file_path):
+        if file_path in self.loaded or file_path in self.loading_files:
+            return self.get_table(file_path).source_model().rowCount()
+        # a tab that was never opened is counted without building its table
+        try:
+            rows = get_store().count(file_path)
+            return "…" if rows is None else rows
+        except Exception as e:
+            print(f"Error counting {file_path}: {str(e)}")
+            return 0
+        
+    @profiled("apply_changes")
+    def apply_changes(self, changes):
+        tables = dict(zip(self.file_paths, self.table_widgets))
+        inserted = {}
+        removed = {}
+
+        for change in changes:
+            # tabs that were never opened pick the change up from the store when they load
+            if change.file_path not in self.loaded:
+                continue
+            model = tables[change.file_path].source_model()
+
+            if change.operation == DELETE:
+                removed.setdefault(model, []).append(change.key)
+            elif change.operation == INSERT:
+                inserted.setdefault(model, []).append(change.row)
+            else:
+                model.update_key(change.key, change.row)
+
+        for model, keys in removed.items():
+            model.remove_keys(keys)
+        for model, rows in inserted.items():
+            model.append_rows(rows)
+
+        self.display_counter()
+        self.dashboard.refresh()
+
+    def open_batch_edit(self, table, unique_ids):
+        dialog = BatchEdit(table.file_path, unique_ids, self)
+        dialog.exec()
+        dialog.deleteLater()
+
     def open_edit_dialogue(self, table, row):
         
         table = self.get_current_table()
         
         if table:
             row_data = table.get_row_data(row)
-            edit_dialog = EditEntry(table.file_path, row_data, table, row, mode="edit", main_window=self)
+            edit_dialog = EditEntry.acquire(table.file_path, row_data, table, row, mode="edit", main_window=self)
             edit_dialog.exec()
-           
-        header = self.get_current_table().horizontalHeader() 
         
     def open_add_dialogue(self):
         entry_type = self.addButton.currentText()
 
-        if entry_type == "Add...":
+        if self.addButton.currentIndex() == 0:
+            return
+
+        if entry_type == "Import CSV...":
+            self.open_import_dialogue()
+            self.reset_add_button()
             return
 
         entry_types = ["Add New Student", "Add New Program", "Add New College"]
@@ -79,55 +327,118 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
         
-        add_dialog = EditEntry(file_path, None, table_widget, None, mode="add", main_window=self)
+        add_dialog = EditEntry.acquire(file_path, None, table_widget, None, mode="add", main_window=self)
         add_dialog.main_window = self
         add_dialog.exec()
         
+        self.reset_add_button()
+
+    def reset_add_button(self):
         self.addButton.blockSignals(True)
         self.addButton.setCurrentIndex(0)
         self.addButton.blockSignals(False)
+
+    def open_import_dialogue(self):
+        table = self.get_current_table()
+        if not table:
+            self.show_error("Open the tab of the table to import into first")
+            return
+
+        source_path, _ = QFileDialog.getOpenFileName(self, "Import CSV", "", "CSV files (*.csv)")
+        if not source_path:
+            return
+
+        try:
+            rows, errors = read_import(source_path, table.file_path)
+        except (OSError, ValueError) as e:
+            self.show_error(f"Could not import {source_path}: {e}")
+            return
+
+        message = QMessageBox(self)
+        message.setWindowTitle("Import CSV")
+        message.setText(f"{len(rows)} valid rows, {len(errors)} rows with errors.")
+
+        if errors:
+            message.setDetailedText(format_errors(errors))
+
+        if not rows:
+            message.setIcon(QMessageBox.Icon.Warning)
+            message.exec()
+            return
+
+        message.setInformativeText("Import the valid rows?")
+        message.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if message.exec() != QMessageBox.StandardButton.Yes:
+            return
+
+        changes = commit_import(table.file_path, rows)
+        if changes is None:
+            self.show_error("Import failed, nothing was written")
+            return
+
+        self.apply_changes(changes)
+        QMessageBox.information(self, "Success", f"Imported {len(rows)} rows")
+    
+    def search_typed(self, text):
+        # text this short can't use the trigram index and matches nearly every row, so it waits for Enter
+        if 0 < len(text.strip()) < GRAM_SIZE:
+            self.searchTimer.stop()
+            self.statusBar().showMessage("Press Enter to search for text this short", 3000)
+            return
+        self.searchTimer.start()
     
+    @pyqtSlot()
+    @profiled("search_table")
     def search_table(self):
         
-        query = self.searchInput.text().strip().lower()
+        self.searchTimer.stop()
+        
+        query = self.searchInput.text().strip()
         table = self.get_current_table()
         
         search_by_field = self.searchBy.currentText()
         headers = self.get_current_table_headers()
         
         if not table or not query:
-            for row in range(table.rowCount()):
-                table.setRowHidden(row, False)
+            self.show_all_rows(table)
             return
         
         if search_by_field == "Search All":
-            for row in range(table.rowCount()):
-                row_matches = False
-                for col in range(table.columnCount()):
-                    item = table.item(row, col)
-                    if item and query in item.text().strip().lower():
-                        row_matches = True
-                        break
-                table.setRowHidden(row, not row_matches)
-            
+            column_index = None
+        elif search_by_field in headers:
+            column_index = headers.index(search_by_field)
         else:
-            if search_by_field in headers:
-                column_index = headers.index(search_by_field) 
-           
-                for row in range(table.rowCount()):
-                    item = table.item(row, column_index)
-                    row_matches = item and query in item.text().strip().lower()
-                    table.setRowHidden(row, not row_matches)
+            return
+        
+        # the index is still being built in the background; search once it is there
+        if not get_store().table(table.file_path).search_ready():
+            self.statusBar().showMessage("Indexing...", 500)
+            self.searchTimer.start()
+            return
+        
+        # words without a field are searched in the Search By column
+        try:
+            matcher = compile_query(get_store(), table.file_path, query, column_index)
+        except QueryError as e:
+            self.statusBar().showMessage(str(e), 5000)
+            return
+        
+        table.model().set_filter(matcher)
                     
     
     def reset_search(self):
+        self.searchTimer.stop()
+        self.searchInput.blockSignals(True)
         self.searchInput.clear()
-        table = self.get_current_table()
+        self.searchInput.blockSignals(False)
+        self.show_all_rows(self.get_current_table())
 
-        if table:
-            for row in range(table.rowCount()):
-                table.setRowHidden(row, False)
+    def show_all_rows(self, table):
+        if table and table.model().matcher is not None:
+            table.model().set_filter(None)
         
+    @pyqtSlot()
+    @profiled("sort_table")
     def sort_table(self):
         table = self.get_current_table()
         
@@ -142,12 +453,7 @@ class MainWindow(QMainWindow):
         
         order = Qt.SortOrder.AscendingOrder if selected_order == "Ascending" else Qt.SortOrder.DescendingOrder
         
-        table.sortItems(column_index, order)
-        
-    def highlight_row(self, row):
-        table = self.get_current_table()
-        if table:
-            table.selectRow(row)
+        table.model().sort(column_index, order)
         
     def populate_combo_boxes(self, headers):
         
@@ -175,22 +481,33 @@ class MainWindow(QMainWindow):
         table = tab_table_map.get(current_tab, None)
         return table
     
+    def get_table(self, file_path):
+        return self.table_widgets[self.file_paths.index(file_path)]
+    
     def get_current_table_headers(self):
         table = self.get_current_table()
-        headers = []
-
-        for col in range(table.columnCount() - 1):
-            header_item = table.horizontalHeaderItem(col)    
-            headers.append(header_item.text())
-                
-        return headers
+        return [] if table is None else list(table.source_model().header)
     
     def tab_changed(self):
+        table = self.get_current_table()
+        if table is None:
+            # the dashboard has nothing to search or sort
+            self.searchTimer.stop()
+            for control in self.tableControls:
+                control.setEnabled(False)
+            return
+        for control in self.tableControls:
+            control.setEnabled(not self.loading)
+        
         headers = self.get_current_table_headers()
         self.populate_combo_boxes(headers)
         self.reset_search()
         self.sortOrder.setCurrentIndex(0)
+        self.load_table(self.get_current_table().file_path)
         
+    def show_error(self, message):
+        QMessageBox.warning(self, "Error", message)
+
     def confirm_action(self, message):
         reply = QMessageBox.question(self, "Confirm Action", message, 
                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, 
@@ -214,6 +531,6 @@ class MainWindow(QMainWindow):
                 table.setColumnWidth(1, 800)  
                 table.setColumnWidth(2, 30)  
             
-            for col in range(table.columnCount()):
+            for col in range(table.model().columnCount()):
                 if not (table == self.studentsTable and col in [6]) and not (table == self.programsTable and col in [1, 3]) and not (table == self.collegesTable and col in [1, 2]):
                     header.setSectionResizeMode(col, QHeaderView.ResizeMode.Stretch)
\ No newline at end of file
@@ -0,0 +1,57 @@
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QCheckBox, QFileDialog
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QFontDatabase
+from functions import profiling
+
+class ProfilerPanel(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Profiler")
+        self.resize(900, 400)
+
+        self.report = QPlainTextEdit(self)
+        self.report.setReadOnly(True)
+        self.report.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+
+        self.enabledBox = QCheckBox("Record timings", self)
+        self.enabledBox.setChecked(profiling.enabled)
+        self.enabledBox.toggled.connect(profiling.set_enabled)
+
+        self.resetButton = QPushButton("Reset", self)
+        self.resetButton.clicked.connect(self.reset)
+        self.saveButton = QPushButton("Save...", self)
+        self.saveButton.clicked.connect(self.save)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.enabledBox)
+        buttons.addStretch()
+        buttons.addWidget(self.resetButton)
+        buttons.addWidget(self.saveButton)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.report)
+        layout.addLayout(buttons)
+
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setInterval(1000)
+        self.refreshTimer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refreshTimer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refreshTimer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        self.report.setPlainText(profiling.format_report())
+
+    def reset(self):
+        profiling.reset()
+        self.refresh()
+
+    def save(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save profile", "profile.json", "JSON files (*.json)")
+        if path:
+            profiling.dump(path)
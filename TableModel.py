@@ -0,0 +1,445 @@
+from itertools import compress
+from operator import itemgetter
+from PyQt6.QtCore import Qt, QObject, QTimer, QAbstractTableModel, QAbstractProxyModel, QModelIndex
+from functions.sorting import SortCache
+
+# inserts into a sorted view past this many rows reset it instead of placing each row
+SORTED_INSERT_LIMIT = 256
+# removing a row one by one costs a pass over the table in the view and each sorted column, so a batch
+# is removed one by one only while rows removed times table rows stays under this, otherwise in one reset
+BATCH_REMOVE_WORK = 100000
+# up to this many rows are mapped to the view by searching its order, past it through the inverse map
+FIND_ROW_LIMIT = 32
+# positions found stale are searched for up to this many rows back, past it they are all fixed at once
+POSITION_SCAN_LIMIT = 32
+
+class TableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.header = []
+        self.rows = []
+        self.key_column = 0
+        self.sorting = SortCache(self)
+
+        self._positions = None
+        # rows from here on may have moved up since _positions was fixed, by at most _removed rows
+        self._stale_from = None
+        self._removed = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        # the extra trailing column holds the row options
+        return len(self.header) + 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.column() >= len(self.header):
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or orientation != Qt.Orientation.Horizontal:
+            return None
+        return self.header[section] if section < len(self.header) else ""
+
+    def set_rows(self, header, rows):
+        self.beginResetModel()
+        self.header = header
+        self.rows = rows
+        self._positions = None
+        self._stale_from, self._removed = None, 0
+        self.sorting.reset()
+        self.endResetModel()
+
+    def row_values(self, row):
+        return self.rows[row]
+
+    def position(self, key):
+        if self._positions is None:
+            self._positions = {row[self.key_column]: index for index, row in enumerate(self.rows)}
+            self._stale_from, self._removed = None, 0
+
+        row = self._positions.get(key)
+        if row is None or self._stale_from is None or row < self._stale_from:
+            return row
+        if self._removed > POSITION_SCAN_LIMIT:
+            self.refresh_positions()
+            return self._positions.get(key)
+
+        key_column = self.key_column
+        for candidate in range(min(row, len(self.rows) - 1), row - self._removed - 1, -1):
+            if self.rows[candidate][key_column] == key:
+                self._positions[key] = candidate
+                return candidate
+        return None
+
+    def refresh_positions(self):
+        first, self._stale_from, self._removed = self._stale_from, None, 0
+        keys = map(itemgetter(self.key_column), self.rows[first:])
+        self._positions.update(zip(keys, range(first, len(self.rows))))
+
+    def forget_position(self, row):
+        # the rows after a removed one shift up; their positions are fixed on the next lookup that needs them
+        if self._positions is not None:
+            self._positions.pop(self.rows[row][self.key_column], None)
+            self._stale_from = row if self._stale_from is None else min(self._stale_from, row)
+            self._removed += 1
+
+    def append_row(self, values):
+        self.append_rows([values])
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+
+        row_pos = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row_pos, row_pos + len(rows) - 1)
+        self.rows.extend(rows)
+        self.sorting.rows_appended(row_pos, rows)
+        if self._positions is not None:
+            for offset, values in enumerate(rows):
+                self._positions[values[self.key_column]] = row_pos + offset
+        self.endInsertRows()
+
+    def update_row(self, row, values):
+        old_key = self.rows[row][self.key_column]
+        self.rows[row] = values
+        self.sorting.row_changed(row, values)
+        if self._positions is not None and values[self.key_column] != old_key:
+            del self._positions[old_key]
+            self._positions[values[self.key_column]] = row
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.header) - 1))
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.forget_position(row)
+        del self.rows[row]
+        self.sorting.row_removed(row)
+        self.endRemoveRows()
+
+    def update_key(self, key, values):
+        row = self.position(key)
+        if row is not None:
+            self.update_row(row, values)
+
+    def remove_key(self, key):
+        row = self.position(key)
+        if row is not None:
+            self.remove_row(row)
+
+    def remove_keys(self, keys):
+        # highest first, so the rows still to remove keep their positions
+        rows = sorted({self.position(key) for key in set(keys)} - {None}, reverse=True)
+        if len(rows) <= 1 or len(rows) * len(self.rows) <= BATCH_REMOVE_WORK:
+            for row in rows:
+                self.remove_row(row)
+            return
+
+        # the sorted columns are fixed up rather than dropped, so the views don't sort again
+        self.beginResetModel()
+        for row in rows:
+            self.forget_position(row)
+            del self.rows[row]
+        self.sorting.rows_removed(rows)
+        self.endResetModel()
+
+
+class FilterProxyModel(QAbstractProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        # source rows in view order; None shows every source row as is
+        self.order = None
+        # returns the keys of the rows to show, or None for no filter
+        self.matcher = None
+        # source column the rows are ordered by, or None for source order
+        self.sort_column = None
+        self.descending = False
+
+        self._inverse = None
+        self._removed_rows = None
+        self._relayout_pending = False
+        # what the matcher returned and, once a broad filter needs it, a byte per source row saying whether it
+        # matched; kept across sorts and as rows come and go, dropped when the filter or the data changes
+        self._keys = None
+        self._mask = None
+
+    def setSourceModel(self, source):
+        super().setSourceModel(source)
+
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        source.modelReset.connect(self.source_reset)
+        source.layoutAboutToBeChanged.connect(self.beginResetModel)
+        source.layoutChanged.connect(self.source_reset)
+        source.rowsAboutToBeInserted.connect(self.source_rows_about_to_be_inserted)
+        source.rowsInserted.connect(self.source_rows_inserted)
+        source.rowsAboutToBeRemoved.connect(self.source_rows_about_to_be_removed)
+        source.rowsRemoved.connect(self.source_rows_removed)
+        source.dataChanged.connect(self.source_data_changed)
+
+    def set_filter(self, matcher):
+        self.beginResetModel()
+        self.matcher = matcher
+        self.forget_matches()
+        self.refresh_order()
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if not 0 <= column < len(self.sourceModel().header):
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        source_rows = [self.source_row(index.row()) for index in old_indexes]
+
+        self.sort_column = column
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        self.refresh_order()
+
+        proxy_row = self.find_proxy_row if len(source_rows) <= FIND_ROW_LIMIT else self.proxy_row
+        self.changePersistentIndexList(old_indexes, [self.index(proxy_row(row), index.column())
+                                                     for row, index in zip(source_rows, old_indexes)])
+        self.layoutChanged.emit()
+
+    def matched_keys(self):
+        if self.matcher is None:
+            return None
+        if self._keys is None:
+            self._keys = self.matcher()
+            self._mask = None
+        return self._keys
+
+    def match_mask(self):
+        if self._mask is None:
+            source = self.sourceModel()
+            keys = map(itemgetter(source.key_column), source.rows)
+            self._mask = bytearray(map(self.matched_keys().__contains__, keys))
+        return self._mask
+
+    def forget_matches(self):
+        self._keys = None
+        self._mask = None
+
+    def refresh_order(self):
+        self._inverse = None
+
+        keys = self.matched_keys()
+        if self.sort_column is not None:
+            self.order = self.sorted_order(keys)
+            return
+
+        if keys is None:
+            self.order = None
+            return
+
+        source = self.sourceModel()
+
+        # look up only the matches when they are few, otherwise one pass in source order
+        if len(keys) * 8 < len(source.rows):
+            positions = (source.position(key) for key in keys)
+            self.order = sorted(row for row in positions if row is not None)
+        else:
+            self.order = list(compress(range(len(source.rows)), self.match_mask()))
+
+    def sorted_order(self, keys):
+        source = self.sourceModel()
+        if keys is None:
+            return list(source.sorting.rows(self.sort_column, self.descending))
+
+        if len(keys) * 8 < len(source.rows):
+            # few matches: sort just those, row order first so equal keys stay stable
+            sort_keys = source.sorting.keys(self.sort_column)
+            rows = sorted(row for row in map(source.position, keys) if row is not None)
+            return sorted(rows, key=sort_keys.__getitem__, reverse=self.descending)
+
+        rows = source.sorting.rows(self.sort_column, self.descending)
+        return list(compress(rows, map(self.match_mask().__getitem__, rows)))
+
+    def before(self, row, other, sort_keys):
+        if sort_keys[row] != sort_keys[other]:
+            return (sort_keys[row] > sort_keys[other]) if self.descending else (sort_keys[row] < sort_keys[other])
+        return row < other
+
+    def insert_sorted(self, rows):
+        sort_keys = self.sourceModel().sorting.keys(self.sort_column)
+
+        for row in rows:
+            low, high = 0, len(self.order)
+            while low < high:
+                middle = (low + high) // 2
+                if self.before(self.order[middle], row, sort_keys):
+                    low = middle + 1
+                else:
+                    high = middle
+
+            self.beginInsertRows(QModelIndex(), low, low)
+            self.order.insert(low, row)
+            self._inverse = None
+            self.endInsertRows()
+
+    def relayout_later(self):
+        if not self._relayout_pending:
+            self._relayout_pending = True
+            QTimer.singleShot(0, self.relayout)
+
+    def relayout(self):
+        self._relayout_pending = False
+        if self.sort_column is None:
+            return
+        self.sort(self.sort_column, Qt.SortOrder.DescendingOrder if self.descending else Qt.SortOrder.AscendingOrder)
+
+    def source_row(self, row):
+        return row if self.order is None else self.order[row]
+
+    def proxy_row(self, source_row):
+        if self.order is None:
+            return source_row
+        if self._inverse is None:
+            self._inverse = {source_row: row for row, source_row in enumerate(self.order)}
+        return self._inverse.get(source_row)
+
+    def find_proxy_row(self, source_row):
+        # for the few rows mapped right after the order changes, searching it beats building the inverse map
+        if self._inverse is not None:
+            return self._inverse.get(source_row)
+        try:
+            return self.order.index(source_row)
+        except ValueError:
+            return None
+
+    def source_reset(self):
+        self.forget_matches()
+        self.refresh_order()
+        self.endResetModel()
+
+    def source_rows_about_to_be_inserted(self, parent, first, last):
+        if self.order is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def source_rows_inserted(self, parent, first, last):
+        if self.order is None:
+            self.endInsertRows()
+            return
+
+        source = self.sourceModel()
+        count = last - first + 1
+        if first < len(source.rows) - count:
+            self.order = [row + count if row >= first else row for row in self.order]
+            self._inverse = None
+
+        keys = None
+        if self.matcher is not None:
+            # the rows already there keep their bits in the mask; only the new ones are looked up
+            keys = self._keys = self.matcher()
+        new_rows = [row for row in range(first, last + 1) if keys is None or source.rows[row][source.key_column] in keys]
+        if self._mask is not None:
+            matched = set(new_rows)
+            self._mask[first:first] = bytes(row in matched for row in range(first, last + 1))
+        if not new_rows:
+            return
+
+        if self.sort_column is not None:
+            if len(new_rows) > SORTED_INSERT_LIMIT:
+                self.beginResetModel()
+                self.refresh_order()
+                self.endResetModel()
+            else:
+                self.insert_sorted(new_rows)
+            return
+
+        self.beginInsertRows(QModelIndex(), len(self.order), len(self.order) + len(new_rows) - 1)
+        self.order.extend(new_rows)
+        self._inverse = None
+        self.endInsertRows()
+
+    def source_rows_about_to_be_removed(self, parent, first, last):
+        if self.order is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            return
+
+        rows = sorted(row for row in map(self.find_proxy_row, range(first, last + 1)) if row is not None)
+        self._removed_rows = rows
+
+        if not rows:
+            return
+        if rows[-1] - rows[0] + 1 == len(rows):
+            self.beginRemoveRows(QModelIndex(), rows[0], rows[-1])
+        else:
+            self.beginResetModel()
+
+    def source_rows_removed(self, parent, first, last):
+        if self.order is None:
+            self.endRemoveRows()
+            return
+
+        count = last - first + 1
+        self.order = [row if row < first else row - count for row in self.order if not first <= row <= last]
+        if self._mask is not None:
+            del self._mask[first:last + 1]
+        self._inverse = None
+
+        rows, self._removed_rows = self._removed_rows, None
+        if not rows:
+            return
+        if rows[-1] - rows[0] + 1 == len(rows):
+            self.endRemoveRows()
+        else:
+            self.endResetModel()
+
+    def source_data_changed(self, top_left, bottom_right, roles=()):
+        # an edited row may match the filter or stop matching, so the next refresh asks the matcher again
+        self.forget_matches()
+
+        # edited rows may have to move; one relayout covers a whole cascade of updates
+        if self.sort_column is not None and top_left.column() <= self.sort_column <= bottom_right.column():
+            self.relayout_later()
+
+        for source_row in range(top_left.row(), bottom_right.row() + 1):
+            row = self.proxy_row(source_row)
+            if row is not None:
+                self.dataChanged.emit(self.index(row, top_left.column()), self.index(row, bottom_right.column()))
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self.source_row(proxy_index.row()), proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = self.proxy_row(source_index.row())
+        return QModelIndex() if row is None else self.index(row, source_index.column())
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        if index is None:
+            return QObject.parent(self)
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self.order is None else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal:
+            return self.sourceModel().headerData(section, orientation, role)
+        return None
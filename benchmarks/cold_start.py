@@ -0,0 +1,72 @@
+# python -m benchmarks.cold_start [students]
+
+import os
+import sys
+import json
+import time
+import shutil
+import threading
+import tempfile
+import subprocess
+from benchmarks.dataset import write_dataset
+
+STUDENTS = "data/students.csv"
+
+def child():
+    # a fresh interpreter, so nothing is cached in memory between runs
+    start = time.perf_counter()
+    from functions.store import get_store
+    from functions.snapshot import snapshot_path
+
+    first = None
+    rows = 0
+    for header, chunk in get_store().stream(STUDENTS):
+        if first is None:
+            first = time.perf_counter() - start
+        rows += len(chunk)
+    loaded = time.perf_counter() - start
+
+    # the snapshot is written in the background after a parse; wait so the next run can use it
+    for thread in threading.enumerate():
+        if thread.name.startswith("snapshot"):
+            thread.join()
+
+    print(json.dumps({"first_ms": first * 1000, "loaded_ms": loaded * 1000, "rows": rows,
+                      "snapshot": os.path.exists(snapshot_path(STUDENTS))}))
+
+def run(directory, snapshots):
+    env = dict(os.environ, SSIS_SNAPSHOTS="1" if snapshots else "0",
+               PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    output = subprocess.run([sys.executable, "-m", "benchmarks.cold_start", "--child"], cwd=directory,
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(args):
+    student_count = int(args[0]) if args else 1_000_000
+    directory = tempfile.mkdtemp(prefix="ssis-cold-start-")
+    try:
+        write_dataset(directory, student_count)
+
+        cases = [
+            ("csv", False),
+            ("csv, writes snapshot", True),
+            ("snapshot", True),
+        ]
+        print(f"{student_count} students")
+        print(f"{'run':<24}{'first rows ms':>14}{'loaded ms':>12}")
+        for name, snapshots in cases:
+            result = run(directory, snapshots)
+            print(f"{name:<24}{result['first_ms']:>14.1f}{result['loaded_ms']:>12.1f}")
+
+        # same bytes, newer mtime: matched by content hash
+        os.utime(os.path.join(directory, STUDENTS))
+        result = run(directory, True)
+        print(f"{'touched, same content':<24}{result['first_ms']:>14.1f}{result['loaded_ms']:>12.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child()
+    else:
+        main(sys.argv[1:])
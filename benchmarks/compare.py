@@ -0,0 +1,40 @@
+# python -m benchmarks.compare BASELINE.json CURRENT.json [threshold]
+
+import sys
+import json
+
+DEFAULT_THRESHOLD = 1.25
+
+def medians(report):
+    for size, results in report["results"].items():
+        for name, result in results.items():
+            if isinstance(result, dict) and "median_ms" in result:
+                yield (size, name), result["median_ms"]
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    before = dict(medians(baseline))
+    regressions = []
+
+    for (size, name), median in medians(current):
+        if (size, name) not in before:
+            continue
+        ratio = median / before[(size, name)] if before[(size, name)] else 1.0
+        flag = "REGRESSION" if ratio > threshold else ""
+        print(f"{size:>9} {name:<22} {before[(size, name)]:>10.3f} -> {median:>10.3f} ms  x{ratio:.2f} {flag}")
+        if ratio > threshold:
+            regressions.append((size, name))
+
+    return regressions
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("usage: python -m benchmarks.compare BASELINE.json CURRENT.json [threshold]")
+        sys.exit(2)
+
+    with open(sys.argv[1], encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(sys.argv[2], encoding="utf-8") as file:
+        current = json.load(file)
+
+    threshold = float(sys.argv[3]) if len(sys.argv) == 4 else DEFAULT_THRESHOLD
+    sys.exit(1 if compare(baseline, current, threshold) else 0)
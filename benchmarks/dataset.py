@@ -0,0 +1,69 @@
+# python -m benchmarks.dataset DIRECTORY STUDENTS
+
+import os
+import sys
+import random
+from functions.csv_operations import write_csv
+from functions.schema import FIELDS, NULL
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "George", "Charles", "Cesar", "Emilio", "Grace", "Paolo",
+               "Andrea", "Miguel", "Sofia", "Rafael", "Isabel", "Gabriel", "Camille", "Carlo", "Bea", "Luis"]
+LAST_NAMES = ["Dela Cruz", "Santos", "Reyes", "Torres", "White", "Agustin", "Anderson", "Garcia", "Mendoza",
+              "Ramos", "Villanueva", "Castillo", "Aquino", "Bautista", "Navarro", "Flores", "Lim", "Tan"]
+GENDERS = ["Male", "Female", "Others", "Prefer not to say"]
+SUBJECTS = ["Computer Science", "Information Technology", "Psychology", "Biology", "Chemistry", "Physics",
+            "Mathematics", "Statistics", "Accountancy", "Economics", "Nursing", "Civil Engineering",
+            "Electrical Engineering", "Mechanical Engineering", "Filipino", "English", "History", "Philosophy"]
+FIELDS_OF_STUDY = ["Arts", "Sciences", "Engineering", "Business", "Health", "Education", "Computing", "Humanities"]
+
+# share of students whose program has been deleted
+NULL_SHARE = 0.01
+
+def letters(number, width):
+    # codes may only contain letters, so encode the number in base 26
+    code = ""
+    for _ in range(width):
+        number, digit = divmod(number, 26)
+        code = chr(ord("A") + digit) + code
+    return code
+
+def student_id(number):
+    return f"{1950 + number // 10000}-{number % 10000:04d}"
+
+def shape(student_count):
+    # colleges and programs grow with the students, starting from the size of the sample data
+    return max(8, student_count // 20_000), max(37, student_count // 1_000)
+
+def write_dataset(directory, student_count, seed=1):
+    rng = random.Random(seed)
+    college_count, program_count = shape(student_count)
+    data_dir = os.path.join(directory, "data")
+    os.makedirs(data_dir, exist_ok=True)
+
+    colleges = [[f"C{letters(i, 3)}", f"College of {FIELDS_OF_STUDY[i % len(FIELDS_OF_STUDY)]} {letters(i, 2)}"]
+                for i in range(college_count)]
+    programs = [[f"BS{letters(i, 3)}", f"Bachelor of Science in {SUBJECTS[i % len(SUBJECTS)]}", rng.choice(colleges)[0]]
+                for i in range(program_count)]
+    codes = [program[0] for program in programs]
+
+    students = []
+    for i in range(student_count):
+        program = NULL if rng.random() < NULL_SHARE else rng.choice(codes)
+        students.append([student_id(i), rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                         str(rng.randint(1, 4)), rng.choice(GENDERS), program])
+    rng.shuffle(students)
+
+    write_csv(os.path.join(data_dir, "colleges.csv"), FIELDS["data/colleges.csv"], colleges)
+    write_csv(os.path.join(data_dir, "programs.csv"), FIELDS["data/programs.csv"], programs)
+    write_csv(os.path.join(data_dir, "students.csv"), FIELDS["data/students.csv"], students)
+
+    return {"students": student_count, "programs": program_count, "colleges": college_count}
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m benchmarks.dataset DIRECTORY STUDENTS")
+        sys.exit(2)
+
+    print(write_dataset(sys.argv[1], int(sys.argv[2])))
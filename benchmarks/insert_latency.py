@@ -0,0 +1,49 @@
+# python -m benchmarks.insert_latency [row counts...]
+
+import os
+import sys
+import time
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from CustomTable import CustomTable
+from TableModel import TableModel
+
+HEADER = ["ID Number", "First Name", "Last Name", "Year Level", "Gender", "Program"]
+
+def make_rows(count, start=0):
+    return [[f"{2000 + i % 25}-{i % 10000:04d}", "Juan", "Dela Cruz", str(i % 4 + 1), "Male", "BSCS"] for i in range(start, start + count)]
+
+def measure(app, row_count, inserts=200):
+    table = CustomTable()
+    model = TableModel(table)
+    model.modelReset.connect(table.set_options_column)
+    table.setModel(model)
+    table.resize(1000, 600)
+    table.show()
+
+    model.set_rows(list(HEADER), make_rows(row_count))
+    app.processEvents()
+
+    timings = []
+    for values in make_rows(inserts, row_count):
+        start = time.perf_counter()
+        model.append_row(values)
+        app.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    table.close()
+    return statistics.median(timings), max(timings)
+
+def main(args):
+    app = QApplication.instance() or QApplication(sys.argv)
+    row_counts = [int(arg) for arg in args] or [10_000, 100_000]
+
+    for row_count in row_counts:
+        median, worst = measure(app, row_count)
+        print(f"{row_count:>9} rows: insert median {median:.3f} ms, max {worst:.3f} ms")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
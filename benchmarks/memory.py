@@ -0,0 +1,77 @@
+# python -m benchmarks.memory [students]
+
+import os
+import csv
+import gc
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+from benchmarks.dataset import write_dataset
+from functions.storage import CsvStorage
+from functions.records import row_packer
+
+STUDENTS = "data/students.csv"
+
+def read_rows(file_path):
+    with open(file_path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        return header, [[value.strip() for value in row] for row in reader if row]
+
+def as_dicts(file_path):
+    # one dict per row, repeating the column names, as csv.DictReader gives them
+    with open(file_path, newline="", encoding="utf-8-sig") as file:
+        return list(csv.DictReader(file))
+
+def as_lists(file_path):
+    return read_rows(file_path)[1]
+
+def as_tuples(file_path):
+    header, rows = read_rows(file_path)
+    pack = row_packer(header)
+    return [pack(row) for row in rows]
+
+def as_table(file_path):
+    # what the store keeps: key -> packed row
+    return CsvStorage().load(file_path)[1]
+
+LAYOUTS = [
+    ("list of dicts", as_dicts),
+    ("list of lists", as_lists),
+    ("packed tuples", as_tuples),
+    ("store table", as_table),
+]
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(STUDENTS)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size, peak, elapsed
+
+def main(args):
+    student_count = int(args[0]) if args else 1_000_000
+    directory = tempfile.mkdtemp(prefix="ssis-memory-")
+    cwd = os.getcwd()
+    try:
+        write_dataset(directory, student_count)
+        os.chdir(directory)
+
+        print(f"{student_count} students")
+        print(f"{'layout':<16}{'MB':>10}{'bytes/student':>16}{'peak MB':>10}{'build s':>10}")
+        for name, build in LAYOUTS:
+            size, peak, elapsed = measure(build)
+            print(f"{name:<16}{size / 2**20:>10.1f}{size / student_count:>16.1f}{peak / 2**20:>10.1f}{elapsed:>10.2f}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,236 @@
+# python -m benchmarks.suite [-o results.json] [--repeat N] [student counts...]
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt6.QtWidgets import QApplication, QMessageBox
+import functions.store as store_module
+from functions.load import load_data
+from functions.delete import delete
+from functions.edit import EditEntry
+from MainWindow import MainWindow
+from benchmarks.dataset import SIZES, write_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STUDENTS = "data/students.csv"
+PROGRAMS = "data/programs.csv"
+
+# (name, search by, query)
+SEARCHES = [
+    ("search_all", "Search All", "san"),
+    ("search_last_name", "Last Name", "san"),
+    ("search_program", "Program", "aah"),
+    ("filter_query", "Search All", "year>=3 gender=Female college:^caa last:^tor"),
+    ("filter_exclude", "Search All", "-gender=Male -year=1"),
+]
+
+DUPLICATE_CHECKS = 1000
+
+def summarize(timings):
+    return {
+        "runs": len(timings),
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+def timed(app, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    app.processEvents()
+    return (time.perf_counter() - start) * 1000, result
+
+def set_silently(widget, text):
+    widget.blockSignals(True)
+    if hasattr(widget, "setCurrentText"):
+        widget.setCurrentText(text)
+    else:
+        widget.setText(text)
+    widget.blockSignals(False)
+
+def fresh_store():
+    store_module._store = None
+    return store_module.get_store()
+
+def open_window(app):
+    fresh_store()
+    start = time.perf_counter()
+    window = MainWindow()
+    window.resize(1200, 800)
+    window.show()
+    # tabs load on first activation, so open each one the benchmarks touch
+    for index in (2, 1, 0):
+        window.tabWidget.setCurrentIndex(index)
+        while window.loading:
+            app.processEvents()
+    window.confirm_action = lambda message: True
+    return window, (time.perf_counter() - start) * 1000
+
+def bench_load(app, window, repeat):
+    timings = []
+    for _ in range(repeat):
+        fresh_store()
+        elapsed, _ = timed(app, load_data, window)
+        timings.append(elapsed)
+    return summarize(timings)
+
+def bench_search(app, window, repeat):
+    records = store_module.get_store().table(STUDENTS)
+    builder = records._search_builder
+    if builder is not None:
+        builder.join()
+
+    results = {}
+    for name, search_by, query in SEARCHES:
+        set_silently(window.searchBy, search_by)
+        set_silently(window.searchInput, query)
+        timings = [timed(app, window.search_table)[0] for _ in range(repeat)]
+        results[name] = dict(summarize(timings), matches=window.studentsTable.model().rowCount())
+
+    window.reset_search()
+    return results
+
+def bench_sort(app, window, repeat):
+    set_silently(window.sortBy, "Last Name")
+    timings = []
+    for run in range(repeat):
+        set_silently(window.sortOrder, "Descending" if run % 2 else "Ascending")
+        timings.append(timed(app, window.sort_table)[0])
+    return summarize(timings)
+
+def most_referenced_programs(count):
+    store = store_module.get_store()
+    codes = store.table(PROGRAMS).sorted_keys()
+    return sorted(codes, key=lambda code: len(store.children_of(PROGRAMS, code)), reverse=True)[:count]
+
+def bench_delete(app, window, repeat):
+    timings, cascaded = [], []
+    for code in most_referenced_programs(repeat):
+        start = time.perf_counter()
+        changes = delete(PROGRAMS, code)
+        window.apply_changes(changes)
+        app.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+        cascaded.append(len(changes) - 1)
+    return dict(summarize(timings), cascaded_rows=cascaded)
+
+def bench_rename(app, window, repeat):
+    records = store_module.get_store().table(PROGRAMS)
+    timings, cascaded = [], []
+    for code in most_referenced_programs(repeat):
+        old_data = records.get_dict(code)
+        new_data = dict(old_data, **{"Program Code": code + "X"})
+        dialog = EditEntry(PROGRAMS, old_data, window.programsTable, None, mode="edit", main_window=window)
+
+        start = time.perf_counter()
+        dialog.edit(PROGRAMS, code, new_data)
+        app.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+
+        cascaded.append(len(store_module.get_store().children_of(PROGRAMS, code + "X")))
+        dialog.deleteLater()
+    return dict(summarize(timings), cascaded_rows=cascaded)
+
+def bench_duplicate_check(app, window, repeat):
+    keys = store_module.get_store().table(STUDENTS).sorted_keys()
+    step = max(1, len(keys) // DUPLICATE_CHECKS)
+    # half existing ids, half ids that are free
+    values = [keys[i] if i % 2 else keys[i][:5] + "x" for i in range(0, len(keys), step)][:DUPLICATE_CHECKS]
+
+    dialog = EditEntry(STUDENTS, None, window.studentsTable, None, mode="add", main_window=window)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            dialog.duplicate_check("ID Number", value)
+        timings.append((time.perf_counter() - start) * 1000)
+    dialog.deleteLater()
+    return dict(summarize(timings), calls_per_run=len(values))
+
+def run_size(app, student_count, repeat):
+    directory = tempfile.mkdtemp(prefix=f"ssis-bench-{student_count}-")
+    cwd = os.getcwd()
+    try:
+        shape = write_dataset(directory, student_count)
+        os.symlink(os.path.join(ROOT, "ui"), os.path.join(directory, "ui"))
+        os.chdir(directory)
+
+        window, startup = open_window(app)
+        window.tabWidget.setCurrentIndex(0)
+
+        results = {"dataset": shape, "startup_ms": round(startup, 3)}
+        results["load_data"] = bench_load(app, window, repeat)
+        results.update(bench_search(app, window, repeat))
+        results["sort_table"] = bench_sort(app, window, repeat)
+        results["delete_cascade"] = bench_delete(app, window, repeat)
+        results["edit_rename_cascade"] = bench_rename(app, window, repeat)
+        results["duplicate_check"] = bench_duplicate_check(app, window, repeat)
+
+        # skip closeEvent, compacting the journals would only slow the run down
+        window.hide()
+        window.deleteLater()
+        app.processEvents()
+        return results
+    finally:
+        # background writes use relative paths, so they finish before leaving the directory
+        store_module.get_store().writer.flush()
+        os.chdir(cwd)
+        fresh_store()
+        shutil.rmtree(directory, ignore_errors=True)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main(args):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("sizes", nargs="*", type=int, default=SIZES, help="student counts to generate")
+    parser.add_argument("-o", "--output", default="benchmark-results.json")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    options = parser.parse_args(args)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    # the dialogs report success and failure through message boxes
+    QMessageBox.information = staticmethod(lambda *args, **kwargs: None)
+    QMessageBox.warning = staticmethod(lambda *args, **kwargs: None)
+
+    report = {
+        "commit": git_commit(),
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "platform": platform.platform(),
+        "repeat": options.repeat,
+        "results": {},
+    }
+
+    for student_count in options.sizes:
+        results = run_size(app, student_count, options.repeat)
+        report["results"][str(student_count)] = results
+        print(f"{student_count:>9} students: load {results['load_data']['median_ms']:.1f} ms, "
+              f"search all {results['search_all']['median_ms']:.1f} ms, "
+              f"sort {results['sort_table']['median_ms']:.1f} ms, "
+              f"delete {results['delete_cascade']['median_ms']:.1f} ms, "
+              f"rename {results['edit_rename_cascade']['median_ms']:.1f} ms")
+
+    with open(options.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {options.output}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+# python -m benchmarks.ui_startup [opens]
+
+import os
+import sys
+import json
+import time
+import statistics
+import subprocess
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ENTRY_FILES = ["data/students.csv", "data/programs.csv", "data/colleges.csv"]
+
+def elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+def time_opens(app, open_dialog, opens):
+    timings = []
+    for run in range(opens):
+        start = time.perf_counter()
+        dialog = open_dialog(ENTRY_FILES[run % len(ENTRY_FILES)])
+        dialog.show()
+        app.processEvents()
+        timings.append(elapsed_ms(start))
+        dialog.hide()
+    return timings
+
+def child(opens):
+    # runs in a fresh interpreter so the window is measured from a cold start
+    start = time.perf_counter()
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    from MainWindow import MainWindow
+    from functions.edit import EditEntry
+    imported = elapsed_ms(start)
+
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    shown = elapsed_ms(start)
+
+    while window.loading:
+        app.processEvents()
+
+    def new_dialog(file_path):
+        return EditEntry(file_path, None, window.get_table(file_path), None, mode="add", main_window=window)
+
+    result = {"import_ms": imported, "window_ms": shown, "new_dialog": time_opens(app, new_dialog, opens)}
+
+    if hasattr(EditEntry, "acquire"):
+        def pooled_dialog(file_path):
+            return EditEntry.acquire(file_path, None, window.get_table(file_path), None, mode="add", main_window=window)
+        result["pooled_dialog"] = time_opens(app, pooled_dialog, opens)
+
+    print(json.dumps(result))
+
+def run(mode, opens):
+    env = dict(os.environ, SSIS_UI_COMPILED="1" if mode == "compiled" else "0")
+    output = subprocess.run([sys.executable, "-m", "benchmarks.ui_startup", "--child", str(opens)],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(args):
+    opens = int(args[0]) if args else 30
+
+    for mode in ["runtime", "compiled"]:
+        result = run(mode, opens)
+        print(f"{mode:>9}: import {result['import_ms']:.1f} ms, window shown {result['window_ms']:.1f} ms")
+        for kind in ["new_dialog", "pooled_dialog"]:
+            if kind in result:
+                timings = result[kind]
+                print(f"{'':>11}{kind}: first {timings[0]:.2f} ms, median {statistics.median(timings[3:] or timings):.2f} ms")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(int(sys.argv[2]))
+    else:
+        main(sys.argv[1:])
@@ -0,0 +1,99 @@
+from collections import Counter
+from functions.schema import NULL
+
+STUDENTS = "data/students.csv"
+PROGRAMS = "data/programs.csv"
+
+class Aggregates:
+    # counts kept up to date from every change the store applies, one step per changed row
+    def __init__(self, store):
+        self.store = store
+        self.built = False
+
+    def ensure_built(self):
+        with self.store.lock:
+            if not self.built:
+                self.build()
+        return self
+
+    def build(self):
+        students = self.store.table(STUDENTS)
+        programs = self.store.table(PROGRAMS)
+
+        self.program_index = students.header.index("Program")
+        self.year_index = students.header.index("Year Level")
+        self.gender_index = students.header.index("Gender")
+        self.code_index = programs.key_index
+        self.college_index = programs.header.index("College")
+
+        self.students = 0
+        self.by_program = Counter()
+        self.by_year = Counter()
+        self.by_gender = Counter()
+        # students per college, through the program they are in
+        self.by_college = Counter()
+        self.programs_by_college = Counter()
+        # program code -> college, for every program row
+        self.program_college = {}
+        # students whose program code has no program row
+        self.dangling = 0
+
+        for row in programs.rows.values():
+            self.count_program(row, 1)
+        for row in students.rows.values():
+            self.count_student(row, 1)
+        self.built = True
+
+    def invalidate(self):
+        self.built = False
+
+    def changed(self, file_path, old_row, new_row):
+        if not self.built:
+            return
+
+        count = self.count_student if file_path == STUDENTS else self.count_program if file_path == PROGRAMS else None
+        if count is None:
+            return
+        if old_row is not None:
+            count(old_row, -1)
+        if new_row is not None:
+            count(new_row, 1)
+
+    @staticmethod
+    def add(counter, key, amount):
+        counter[key] += amount
+        if not counter[key]:
+            del counter[key]
+
+    def count_student(self, row, sign):
+        program = row[self.program_index]
+        self.students += sign
+        self.add(self.by_program, program, sign)
+        self.add(self.by_year, row[self.year_index], sign)
+        self.add(self.by_gender, row[self.gender_index], sign)
+
+        college = self.program_college.get(program)
+        if college is not None:
+            self.add(self.by_college, college, sign)
+        elif program != NULL:
+            self.dangling += sign
+
+    def count_program(self, row, sign):
+        code, college = row[self.code_index], row[self.college_index]
+        if sign > 0:
+            self.program_college[code] = college
+        else:
+            self.program_college.pop(code, None)
+
+        # the program's students move in or out of its college together
+        enrolled = self.by_program.get(code, 0)
+        self.add(self.programs_by_college, college, sign)
+        self.add(self.by_college, college, sign * enrolled)
+        if code != NULL:
+            self.dangling -= sign * enrolled
+
+    def without_program(self):
+        return self.by_program.get(NULL, 0)
+
+    def programs_without_college(self):
+        return self.programs_by_college.get(NULL, 0)
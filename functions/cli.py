@@ -0,0 +1,231 @@
+# python -m functions.cli COMMAND TABLE ...   (no Qt is loaded; see --help)
+
+import csv
+import sys
+import shlex
+import argparse
+from functions.schema import FIELDS, PRIMARY_KEYS
+from functions.store import get_store
+from functions.validation import validate_record, validate_value, duplicate_error
+from functions.import_csv import read_import, commit_import, format_errors
+from functions.csv_operations import write_csv
+from functions.sorting import key_function
+from functions.query import compile_query
+
+TABLES = {
+    "students": "data/students.csv",
+    "programs": "data/programs.csv",
+    "colleges": "data/colleges.csv",
+}
+
+_parser = None
+
+def parse_assignments(file_path, pairs):
+    values = {}
+    for pair in pairs:
+        field, separator, value = pair.partition("=")
+        field = field.strip()
+        if not separator or field not in FIELDS[file_path]:
+            raise ValueError(f"Expected FIELD=VALUE with FIELD one of {', '.join(FIELDS[file_path])}, got {pair!r}")
+        values[field] = value
+    return values
+
+def column_index(table, column):
+    if column not in table.header:
+        raise ValueError(f"Unknown column {column!r}, expected one of {', '.join(table.header)}")
+    return table.header.index(column)
+
+def ordered(table, rows, args):
+    if args.sort:
+        index = column_index(table, args.sort)
+        key = key_function(args.sort)
+        rows = sorted(rows, key=lambda row: key(row[index]), reverse=args.descending)
+    if args.limit is not None:
+        rows = list(rows)[:args.limit]
+    return rows
+
+def write_rows(output, header, rows):
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+
+def cascaded(changes):
+    return sum(1 for change in changes if change.cascade)
+
+def list_rows(store, args, output):
+    table = store.table(args.file_path)
+    write_rows(output, table.header, ordered(table, table.rows.values(), args))
+    return 0
+
+def query_rows(store, args, output):
+    table = store.table(args.file_path)
+    column = column_index(table, args.column) if args.column else None
+    keys = compile_query(store, args.file_path, args.text.strip(), column)()
+    rows = [row for key, row in table.rows.items() if key in keys]
+    write_rows(output, table.header, ordered(table, rows, args))
+    return 0
+
+def add_row(store, args, output):
+    record = parse_assignments(args.file_path, args.values)
+    row, errors = validate_record(args.file_path, record, store)
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    if store.insert(args.file_path, row) is None:
+        raise ValueError("Failed to add entry")
+    print(f"Added {row[store.table(args.file_path).key_index]}", file=output)
+    return 0
+
+def edit_row(store, args, output):
+    table = store.table(args.file_path)
+    if args.key not in table:
+        raise ValueError(f"{args.key} not found")
+
+    row = list(table.get(args.key))
+    errors = []
+    for field, value in parse_assignments(args.file_path, args.values).items():
+        value, error = validate_value(field, value, store)
+        if error:
+            errors.append(error)
+        row[table.header.index(field)] = value
+
+    new_key = row[table.key_index]
+    if new_key != args.key and new_key in table:
+        errors.append(duplicate_error(PRIMARY_KEYS[args.file_path]))
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    changes = store.update(args.file_path, args.key, row)
+    if changes is None:
+        raise ValueError("Failed to save changes")
+    print(f"Updated {args.key}, {cascaded(changes)} rows changed by cascade", file=output)
+    return 0
+
+def delete_rows(store, args, output):
+    table = store.table(args.file_path)
+    missing = [key for key in args.keys if key not in table]
+    if missing:
+        raise ValueError(f"Not found: {', '.join(missing)}")
+
+    changes = store.delete_many(args.file_path, args.keys)
+    if changes is None:
+        raise ValueError("Failed to complete deletion")
+    print(f"Deleted {len(changes) - cascaded(changes)} rows, {cascaded(changes)} rows set to NULL by cascade", file=output)
+    return 0
+
+def import_rows(store, args, output):
+    rows, errors = read_import(args.source, args.file_path, store)
+    if errors:
+        print(format_errors(errors), file=sys.stderr)
+
+    if rows and commit_import(args.file_path, rows, store) is None:
+        raise ValueError("Import failed, nothing was written")
+    print(f"Imported {len(rows)} rows, skipped {len(errors)}", file=output)
+    return 0
+
+def export_rows(store, args, output):
+    table = store.table(args.file_path)
+    rows = ordered(table, table.rows.values(), args)
+    if args.destination == "-":
+        write_rows(output, table.header, rows)
+    else:
+        write_csv(args.destination, table.header, rows)
+        print(f"Exported {len(rows)} rows to {args.destination}", file=output)
+    return 0
+
+def run_batch(store, args, output):
+    # every line is one command; all of them share one load and reach the storage as one write
+    source = sys.stdin if args.source == "-" else open(args.source, newline="", encoding="utf-8")
+    commands = failures = 0
+
+    with source, store.batch():
+        for number, line in enumerate(source, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            commands += 1
+            try:
+                command = parse(shlex.split(line))
+                if command.run is run_batch:
+                    raise ValueError("batch files can't start another batch")
+                command.run(store, command, output)
+            except (ValueError, OSError) as e:
+                failures += 1
+                print(f"Line {number}: {str(e)}", file=sys.stderr)
+            except SystemExit:
+                # argparse has already printed what was wrong
+                failures += 1
+                print(f"Line {number}: invalid command", file=sys.stderr)
+
+    print(f"Ran {commands} commands, {failures} failed", file=sys.stderr)
+    return 1 if failures else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m functions.cli", description="Work with the SSIS data without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(name, run, help_text, sortable=False):
+        subparser = commands.add_parser(name, help=help_text)
+        subparser.set_defaults(run=run)
+        if name != "batch":
+            subparser.add_argument("table", choices=TABLES)
+        if sortable:
+            subparser.add_argument("--sort", metavar="COLUMN", help="column to order the rows by")
+            subparser.add_argument("--descending", action="store_true")
+            subparser.add_argument("--limit", type=int, help="print at most this many rows")
+        return subparser
+
+    command("list", list_rows, "print a table as CSV", sortable=True)
+
+    query = command("query", query_rows, "print the rows matching a search, e.g. 'program:BSCS year>=3 -gender=Male'", sortable=True)
+    query.add_argument("text")
+    query.add_argument("--column", help="only look for words without a field in this column")
+
+    add = command("add", add_row, "add a row")
+    add.add_argument("values", nargs="+", metavar="FIELD=VALUE")
+
+    edit = command("edit", edit_row, "change fields of a row, renames cascade")
+    edit.add_argument("key")
+    edit.add_argument("values", nargs="+", metavar="FIELD=VALUE")
+
+    delete = command("delete", delete_rows, "delete rows, references to them become NULL")
+    delete.add_argument("keys", nargs="+", metavar="KEY")
+
+    import_command = command("import", import_rows, "add the valid rows of a CSV file")
+    import_command.add_argument("source")
+
+    export = command("export", export_rows, "write a table to a CSV file, - for stdout", sortable=True)
+    export.add_argument("destination")
+
+    batch = command("batch", run_batch, "run the commands in a file, - for stdin")
+    batch.add_argument("source")
+
+    return parser
+
+def parse(argv):
+    # batch files parse every line, so the parser is only built once
+    global _parser
+    if _parser is None:
+        _parser = build_parser()
+    args = _parser.parse_args(argv)
+    if hasattr(args, "table"):
+        args.file_path = TABLES[args.table]
+    return args
+
+def main(argv=None):
+    args = parse(argv)
+
+    store = get_store()
+    try:
+        status = args.run(store, args, sys.stdout)
+    except (ValueError, OSError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        status = 1
+    finally:
+        if not store.close():
+            status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
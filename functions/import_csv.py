@@ -0,0 +1,64 @@
+import csv
+import sys
+from functions.schema import FIELDS
+from functions.store import get_store
+from functions.validation import validate_record
+
+def read_import(source_path, file_path, store=None):
+    store = store or get_store()
+    fields = FIELDS[file_path]
+
+    valid_rows = []
+    errors = []
+    pending_keys = set()
+    key_index = store.table(file_path).key_index
+
+    with open(source_path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        if reader.fieldnames is None:
+            raise ValueError(f"{source_path} is empty")
+
+        reader.fieldnames = [name.strip() for name in reader.fieldnames]
+        missing = [field for field in fields if field not in reader.fieldnames]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        for record in reader:
+            if not any(record.values()):
+                continue
+
+            row, row_errors = validate_record(file_path, record, store, pending_keys)
+            if row_errors:
+                errors.append((reader.line_num, row_errors))
+                continue
+
+            pending_keys.add(row[key_index])
+            valid_rows.append(row)
+
+    return valid_rows, errors
+
+def commit_import(file_path, rows, store=None):
+    store = store or get_store()
+    return store.insert_many(file_path, rows)
+
+def format_errors(errors):
+    return "\n".join(f"Line {line}: {'; '.join(messages)}" for line, messages in errors)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m functions.import_csv SOURCE.csv data/TABLE.csv")
+        sys.exit(2)
+
+    source_path, file_path = sys.argv[1], sys.argv[2]
+    rows, errors = read_import(source_path, file_path)
+
+    if errors:
+        print(format_errors(errors))
+
+    store = get_store()
+    if rows and commit_import(file_path, rows, store) is None:
+        print("Import failed, nothing was written")
+        sys.exit(1)
+
+    store.close()
+    print(f"Imported {len(rows)} rows, skipped {len(errors)}")
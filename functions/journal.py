@@ -0,0 +1,123 @@
+import csv
+import os
+from functions.records import rename_key
+from functions.profiling import profiled, add_bytes
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+class Journal:
+    def __init__(self, file_path):
+        self.path = file_path + ".journal"
+        self.entries = 0
+
+    def size(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    @profiled("journal.append")
+    def append(self, entries):
+        # entries are (operation, key, row) tuples; row is empty for deletes
+        with open(self.path, "a", newline="", encoding="utf-8") as file:
+            start = file.tell()
+            writer = csv.writer(file)
+            for operation, key, row in entries:
+                writer.writerow([operation, key, *row])
+            file.flush()
+            add_bytes("journal.append", written=file.tell() - start)
+
+        self.entries += len(entries)
+        return True
+
+    def replay(self, rows, key_index, width, pack=tuple, base=None):
+        # base, when given, receives the base file's row (None if it had none) for every key an entry touches
+        if not os.path.exists(self.path):
+            return 0
+
+        replayed = 0
+        with open(self.path, "r", newline="", encoding="utf-8") as file:
+            for entry in csv.reader(file):
+                if len(entry) < 2:
+                    continue
+
+                operation, key, row = entry[0], entry[1], entry[2:]
+                if operation == UPDATE and len(row) == width:
+                    touched = (key, row[key_index])
+                else:
+                    touched = (key,)
+                if base is not None:
+                    for touched_key in touched:
+                        if touched_key not in base:
+                            base[touched_key] = rows.get(touched_key)
+
+                # every entry writes absolute values, so replaying entries that
+                # are already part of the base file leaves the rows unchanged
+                if operation == DELETE:
+                    rows.pop(key, None)
+                elif len(row) != width:
+                    continue
+                elif operation == INSERT:
+                    rows[key] = pack(row)
+                elif operation == UPDATE:
+                    new_key = row[key_index]
+                    if new_key != key:
+                        rename_key(rows, key, new_key, pack(row))
+                    else:
+                        rows[new_key] = pack(row)
+                else:
+                    continue
+
+                replayed += 1
+
+        self.entries = replayed
+        return replayed
+
+    def net_rows(self, key_index, width):
+        # rows the entries add, less the rows they remove, without reading the base file;
+        # a key is taken to be as the entries before it left it, or as the store saw it when writing the entry
+        if not os.path.exists(self.path):
+            return 0
+
+        present = {}
+        net = 0
+        with open(self.path, "r", newline="", encoding="utf-8") as file:
+            for entry in csv.reader(file):
+                if len(entry) < 2:
+                    continue
+
+                operation, key, row = entry[0], entry[1], entry[2:]
+                if operation == DELETE:
+                    if present.get(key, True):
+                        net -= 1
+                    present[key] = False
+                elif len(row) != width:
+                    continue
+                elif operation == INSERT:
+                    if not present.get(key, False):
+                        net += 1
+                    present[key] = True
+                elif operation == UPDATE and row[key_index] != key:
+                    present[key] = False
+                    present[row[key_index]] = True
+        return net
+
+    def discard(self, offset):
+        # drop the entries that were already compacted, keep anything newer
+        if offset <= 0 or not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            tail = file.read()
+
+        if not tail:
+            os.remove(self.path)
+            self.entries = 0
+            return
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(tail)
+        os.replace(temp_path, self.path)
+
+        self.entries = tail.count(b"\n")
@@ -1,40 +1,77 @@
 #reading, writing, deleting
 
-import csv
-from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QPushButton
-from PyQt6.QtCore import QCoreApplication
-
-def load_csv_data(table: QTableWidget, file_path: str):
-    
-    data_list = []
-
-    with open(file_path, newline='', encoding='utf-8-sig') as file:
-        reader = csv.DictReader(file)
-        
-        header = [h.strip() for h in reader.fieldnames]
-        table.setHorizontalHeaderLabels(header)
-        
-        data = list(reader)
-        table.setRowCount(len(data))
-        
-        for row_idx, row in enumerate(data): 
-            row_dict = {}
-            for col_idx, key in enumerate(reader.fieldnames):
-                value = row.get(key, "").strip()
-                table.setItem(row_idx, col_idx, QTableWidgetItem(value))
-                
-                options_button = QPushButton("⋮")
-                options_button.clicked.connect(lambda _, t=table, b=options_button, r=row_idx: t.show_options_menu(b, r))
-
-                table.setCellWidget(row_idx, len(header), options_button)
-                
-                row_dict[key] = value
-                
-            data_list.append(row_dict)
-
-    return data_list
+from PyQt6.QtWidgets import QTableView
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from functions.store import get_store
+from functions.profiling import profiled, measure
+
+@profiled("load_csv_data")
+def load_csv_data(table: QTableView, file_path: str):
+
+    records = get_store().table(file_path)
+    rows = list(records.rows.values())
+
+    table.source_model().set_rows(list(records.header), rows)
+    records.prepare_search()
+
+    return rows
 
 def load_data(main_window):
     main_window.studentsData = load_csv_data(main_window.studentsTable, "data/students.csv")
     main_window.programsData = load_csv_data(main_window.programsTable, "data/programs.csv")
-    main_window.collegesData = load_csv_data(main_window.collegesTable, "data/colleges.csv")
\ No newline at end of file
+    main_window.collegesData = load_csv_data(main_window.collegesTable, "data/colleges.csv")
+
+class LoadWorker(QObject):
+    chunk_loaded = pyqtSignal(str, list, object)
+    # the flag is set when the streamed rows differ from the final table, e.g. after a journal replay
+    table_loaded = pyqtSignal(str, bool)
+    failed = pyqtSignal(str, str)
+    finished = pyqtSignal(list)
+
+    def __init__(self, file_paths):
+        super().__init__()
+        self.file_paths = file_paths
+
+    def run(self):
+        store = get_store()
+        thread = QThread.currentThread()
+
+        for file_path in self.file_paths:
+            if thread.isInterruptionRequested():
+                break
+
+            streamed = 0
+            chunks = store.stream(file_path)
+            try:
+                with measure("load.stream"):
+                    for header, rows in chunks:
+                        if thread.isInterruptionRequested():
+                            break
+                        self.chunk_loaded.emit(file_path, header, rows)
+                        streamed += len(rows)
+            except Exception as e:
+                self.failed.emit(file_path, str(e))
+                continue
+            finally:
+                chunks.close()
+
+            table = store.tables.get(file_path)
+            if table is not None:
+                self.table_loaded.emit(file_path, table.replayed > 0 or len(table) != streamed)
+
+        self.finished.emit(self.file_paths)
+
+def load_data_in_background(main_window, file_paths):
+    thread = QThread(main_window)
+    worker = LoadWorker(file_paths)
+    worker.moveToThread(thread)
+
+    thread.started.connect(worker.run)
+    worker.chunk_loaded.connect(main_window.add_loaded_rows)
+    worker.table_loaded.connect(main_window.finish_table_load)
+    worker.failed.connect(main_window.report_load_error)
+    worker.finished.connect(main_window.finish_loading)
+    worker.finished.connect(thread.quit)
+
+    thread.start()
+    return thread, worker
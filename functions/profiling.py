@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import atexit
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# SSIS_PROFILE=1 turns timing on from the start; SSIS_PROFILE_OUTPUT picks where the report goes at exit
+ENV_FLAG = "SSIS_PROFILE"
+ENV_OUTPUT = "SSIS_PROFILE_OUTPUT"
+
+# percentiles are taken over the most recent samples only
+SAMPLES = 10_000
+
+enabled = os.environ.get(ENV_FLAG, "") not in ("", "0")
+
+metrics = {}
+_lock = threading.Lock()
+_off = nullcontext()
+
+class Metric:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.samples = deque(maxlen=SAMPLES)
+
+def set_enabled(value):
+    global enabled
+    enabled = value
+
+def reset():
+    with _lock:
+        metrics.clear()
+
+def metric(name):
+    found = metrics.get(name)
+    if found is None:
+        found = metrics[name] = Metric()
+    return found
+
+def record(name, elapsed_ms):
+    with _lock:
+        entry = metric(name)
+        entry.count += 1
+        entry.total += elapsed_ms
+        entry.samples.append(elapsed_ms)
+
+def add_bytes(name, read=0, written=0):
+    if enabled:
+        with _lock:
+            entry = metric(name)
+            entry.bytes_read += read
+            entry.bytes_written += written
+
+def profiled(name):
+    # Qt slots also need @pyqtSlot() above this, or PyQt passes every signal argument through the wrapper
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+def measure(name):
+    return _timer(name) if enabled else _off
+
+@contextmanager
+def _timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000)
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def snapshot():
+    with _lock:
+        entries = {name: (entry.count, entry.total, entry.bytes_read, entry.bytes_written, sorted(entry.samples))
+                   for name, entry in metrics.items()}
+
+    report = {}
+    for name, (calls, total, bytes_read, bytes_written, ordered) in sorted(entries.items()):
+        report[name] = {
+            "count": calls,
+            "total_ms": round(total, 3),
+            "p50_ms": None if not ordered else round(percentile(ordered, 0.50), 3),
+            "p95_ms": None if not ordered else round(percentile(ordered, 0.95), 3),
+            "p99_ms": None if not ordered else round(percentile(ordered, 0.99), 3),
+            "bytes_read": bytes_read,
+            "bytes_written": bytes_written,
+        }
+    return report
+
+def format_report(report=None):
+    report = snapshot() if report is None else report
+    if not report:
+        return "No measurements yet." if enabled else f"Profiling is off. Set {ENV_FLAG}=1 or enable it here."
+
+    def ms(value):
+        return "-" if value is None else f"{value:.2f}"
+
+    lines = [f"{'name':<28}{'count':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total ms':>12}{'read':>12}{'written':>12}"]
+    for name, entry in report.items():
+        lines.append(f"{name:<28}{entry['count']:>9}{ms(entry['p50_ms']):>10}{ms(entry['p95_ms']):>10}"
+                     f"{ms(entry['p99_ms']):>10}{entry['total_ms']:>12.1f}{entry['bytes_read']:>12}{entry['bytes_written']:>12}")
+    return "\n".join(lines)
+
+def dump(path):
+    try:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(snapshot(), file, indent=2)
+    except OSError as e:
+        print(f"Error writing profile to {path}: {str(e)}")
+        return False
+    return True
+
+def dump_at_exit():
+    if metrics:
+        dump(os.environ.get(ENV_OUTPUT, "profile.json"))
+
+if enabled:
+    atexit.register(dump_at_exit)
@@ -0,0 +1,173 @@
+import re
+from collections import namedtuple
+from functions.store import PARENT_FILES
+from functions.profiling import profiled
+
+# program:BSCS year>=3 -gender:male college:ccs last:^tor "first name:juan|maria"
+# words without a field, or whose field no table has, are searched as one phrase like the plain search bar
+TERM = re.compile(r"(-?)([A-Za-z][A-Za-z ]*?)\s*(!=|>=|<=|:|=|>|<)(.*)", re.S)
+# a quote with no closing one after it is kept as text
+TOKEN = re.compile(r'(?:"[^"]*"|"(?=[^"]*$)|[^\s"])+')
+QUOTED = re.compile(r'"([^"]*)"')
+
+COMPARISONS = {
+    ">": lambda value, operand: value > operand,
+    ">=": lambda value, operand: value >= operand,
+    "<": lambda value, operand: value < operand,
+    "<=": lambda value, operand: value <= operand,
+}
+
+Term = namedtuple("Term", ["negated", "field", "operator", "value"])
+
+class QueryError(ValueError):
+    pass
+
+def parse(text, is_field):
+    # a token is a field term only when is_field knows its field; anything else is searched as text
+    terms = []
+    words = []
+    for token in TOKEN.findall(text):
+        token = QUOTED.sub(r"\1", token)
+        match = TERM.fullmatch(token)
+        if match is None or not is_field(match.group(2).strip()):
+            words.append(token)
+            continue
+
+        negated, field, operator, value = match.groups()
+        if not value:
+            raise QueryError(f"{field}{operator} needs a value")
+        if operator == "!=":
+            negated, operator = not negated, "="
+        terms.append(Term(bool(negated), field.strip(), operator, value))
+
+    # without field terms the whole text is one phrase, as the plain search always took it
+    if not terms:
+        return [Term(False, None, ":", text)] if text else []
+    if words:
+        terms.insert(0, Term(False, None, ":", " ".join(words)))
+    return terms
+
+def column_named(header, field):
+    # the column itself, or the one column with field as one of its words
+    folded = field.casefold().replace(" ", "")
+    for index, column in enumerate(header):
+        if column.casefold().replace(" ", "") == folded:
+            return index
+
+    candidates = [index for index, column in enumerate(header) if folded in column.casefold().split()]
+    if len(candidates) > 1:
+        raise QueryError(f"{field} could mean {' or '.join(header[index] for index in candidates)}")
+    return candidates[0] if candidates else None
+
+def resolve(store, file_path, field):
+    # the tables from file_path up to the one holding the column, following DEPENDENCY_MAP to the parents;
+    # None when none of them has it
+    path = [file_path]
+    while True:
+        index = column_named(store.table(path[-1]).header, field)
+        if index is not None:
+            return path, index
+        if path[-1] not in PARENT_FILES:
+            return None
+        path.append(PARENT_FILES[path[-1]])
+
+def comparable(text):
+    # numbers compare as numbers; text only compares with text
+    try:
+        return 0, float(text)
+    except ValueError:
+        return 1, text
+
+def value_selector(operator, value):
+    # returns a function from a column index to the lowercased values the term matches
+    value = value.lower()
+
+    if operator in COMPARISONS:
+        compare = COMPARISONS[operator]
+        operand = comparable(value)
+
+        def select(column):
+            selected = []
+            for candidate in column.postings:
+                kind, number = comparable(candidate)
+                if kind == operand[0] and compare(number, operand[1]):
+                    selected.append(candidate)
+            return selected
+        return select
+
+    alternatives = value.split("|")
+    if operator == "=":
+        return lambda column: [text for text in alternatives if text in column.postings]
+
+    def select(column):
+        selected = set()
+        for text in alternatives:
+            if len(text) > 1 and text.startswith("^") and text.endswith("$"):
+                if text[1:-1] in column.postings:
+                    selected.add(text[1:-1])
+            elif text.startswith("^"):
+                selected.update(candidate for candidate in column.matching_values(text[1:]) if candidate.startswith(text[1:]))
+            elif text.endswith("$"):
+                selected.update(candidate for candidate in column.matching_values(text[:-1]) if candidate.endswith(text[:-1]))
+            else:
+                selected.update(column.matching_values(text))
+        return selected
+    return select
+
+def compile_term(store, file_path, term, column):
+    # returns a function giving the key sets whose union is every row the term matches
+    if term.field is None:
+        table = store.table(file_path)
+        return lambda: [table.search(term.value, column)]
+
+    path, index = resolve(store, file_path, term.field)
+    select = value_selector(term.operator, term.value)
+    table = store.table(path[-1])
+
+    def matching():
+        index_column = table.search_index().columns[index]
+        key_sets = [index_column.postings[value] for value in select(index_column)]
+
+        # the parent rows that match, then the children pointing at them, down to file_path
+        for parent_file in reversed(path[1:]):
+            references = store.reference_index(parent_file)
+            parents = set().union(*key_sets)
+            key_sets = [references[key] for key in parents if key in references]
+        return key_sets
+    return matching
+
+def intersect(keys, key_sets):
+    # each step only walks the smaller side, so a small result stays cheap against big sets
+    return set().union(*(keys & other for other in key_sets))
+
+def compile_query(store, file_path, text, column=None):
+    # parsed and resolved once; the matcher runs against the tables as they are when it is called
+    table = store.table(file_path)
+    terms = parse(text, lambda field: resolve(store, file_path, field) is not None)
+    terms = [(term.negated, compile_term(store, file_path, term, column)) for term in terms]
+
+    @profiled("query.match")
+    def matcher():
+        included = [matching() for negated, matching in terms if not negated]
+        excluded = [matching() for negated, matching in terms if negated]
+
+        if included:
+            included.sort(key=lambda key_sets: sum(map(len, key_sets)))
+            keys = set().union(*included[0])
+            for key_sets in included[1:]:
+                if not keys:
+                    break
+                keys = intersect(keys, key_sets)
+        else:
+            keys = set(table.rows)
+
+        for key_sets in excluded:
+            if not keys:
+                break
+            if sum(map(len, key_sets)) <= len(keys):
+                keys.difference_update(*key_sets)
+            else:
+                keys -= intersect(keys, key_sets)
+        return keys
+
+    return matcher
@@ -0,0 +1,32 @@
+from functions.schema import CATEGORY_FIELDS
+
+# column name -> value -> the string object every row holding that value points at
+_shared = {}
+
+def row_packer(header):
+    # rows are kept as tuples in header order; the header itself lives once on the table
+    columns = [(index, _shared.setdefault(column, {})) for index, column in enumerate(header) if column in CATEGORY_FIELDS]
+    if not columns:
+        return tuple
+
+    def pack(row):
+        values = list(row)
+        for index, values_seen in columns:
+            value = values[index]
+            values[index] = values_seen.setdefault(value, value)
+        return tuple(values)
+
+    return pack
+
+def rename_key(rows, key, new_key, row):
+    # the renamed row keeps its place, so writing the table back keeps the file's row order
+    if key not in rows:
+        rows[new_key] = row
+        return
+    keys = list(rows)
+    values = list(rows.values())
+    position = keys.index(key)
+    keys[position] = new_key
+    values[position] = row
+    rows.clear()
+    rows.update(zip(keys, values))
@@ -0,0 +1,67 @@
+import os
+from PyQt6.QtCore import QStringListModel
+from functions.store import get_store
+
+class ReferenceData:
+    def __init__(self):
+        self.stamp = None
+        self.codes = []
+        # combobox items start with a blank entry like the placeholders in the .ui files
+        self.choices = QStringListModel([""])
+        self.completions = QStringListModel()
+
+    def update(self, stamp, codes):
+        self.stamp = stamp
+        if codes != self.codes:
+            self.codes = codes
+            self.choices.setStringList([""] + codes)
+            self.completions.setStringList(codes)
+
+class ReferenceCache:
+    def __init__(self):
+        # (file path, column) -> ReferenceData shared by every dialog showing those codes
+        self.entries = {}
+
+    def stamp(self, file_path, table):
+        # an in-app write bumps the version, a reload swaps the table, an outside edit moves mtime or size
+        try:
+            stat = os.stat(file_path)
+            disk = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            disk = None
+        return (table, table.version, disk)
+
+    def get(self, file_path, column):
+        table = get_store().table(file_path)
+        stamp = self.stamp(file_path, table)
+
+        entry = self.entries.get((file_path, column))
+        if entry is None:
+            entry = self.entries[(file_path, column)] = ReferenceData()
+        if entry.stamp != stamp:
+            entry.update(stamp, self.read_codes(table, column))
+        return entry
+
+    def read_codes(self, table, column):
+        if not table.header or not len(table):
+            print(f"Empty CSV file: {table.file_path}")
+            return []
+
+        if column == table.header[table.key_index]:
+            return list(table.sorted_keys())
+
+        index = table.header.index(column)
+        return sorted({row[index] for row in table.rows.values()})
+
+    def invalidate(self, file_path=None):
+        for key, entry in self.entries.items():
+            if file_path is None or key[0] == file_path:
+                entry.stamp = None
+
+_cache = None
+
+def get_reference_cache():
+    global _cache
+    if _cache is None:
+        _cache = ReferenceCache()
+    return _cache
@@ -0,0 +1,18 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+class SaveNotifier(QObject):
+    # relays the writer thread's results to the GUI thread
+    saved = pyqtSignal(list, str)
+    failed = pyqtSignal(list, str)
+
+    def __init__(self, writer, parent=None):
+        super().__init__(parent)
+        self.writer = writer
+        writer.listeners.append(self.notify)
+
+    def notify(self, saved, file_paths, message):
+        (self.saved if saved else self.failed).emit(file_paths, message)
+
+    def detach(self):
+        if self.notify in self.writer.listeners:
+            self.writer.listeners.remove(self.notify)
@@ -0,0 +1,21 @@
+PRIMARY_KEYS = {
+    "data/students.csv": "ID Number",
+    "data/programs.csv": "Program Code",
+    "data/colleges.csv": "College Code"
+}
+
+DEPENDENCY_MAP = {
+    "data/colleges.csv": {"file": "data/programs.csv", "table": "programsTable", "key": "College Code", "child_key": "College"},
+    "data/programs.csv": {"file": "data/students.csv", "table": "studentsTable", "key": "Program Code", "child_key": "Program"}
+}
+
+NULL = "NULL"
+
+FIELDS = {
+    "data/students.csv": ["ID Number", "First Name", "Last Name", "Year Level", "Gender", "Program"],
+    "data/programs.csv": ["Program Code", "Program Name", "College"],
+    "data/colleges.csv": ["College Code", "College Name"]
+}
+
+# columns with few distinct values; every row shares one string object per value
+CATEGORY_FIELDS = {"Year Level", "Gender", "Program", "College"}
@@ -0,0 +1,118 @@
+GRAM_SIZE = 3
+
+def grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+class ColumnIndex:
+    def __init__(self):
+        # lowercased value -> keys of the rows holding it
+        self.postings = {}
+        # trigram -> lowercased values containing it
+        self.grams = {}
+
+    def add(self, value, key):
+        keys = self.postings.get(value)
+        if keys is None:
+            keys = self.postings[value] = set()
+            for gram in grams(value):
+                self.grams.setdefault(gram, set()).add(value)
+        keys.add(key)
+
+    def remove(self, value, key):
+        keys = self.postings.get(value)
+        if keys is None:
+            return
+
+        keys.discard(key)
+        if keys:
+            return
+
+        del self.postings[value]
+        for gram in grams(value):
+            values = self.grams.get(gram)
+            if values is not None:
+                values.discard(value)
+                if not values:
+                    del self.grams[gram]
+
+    def matching_values(self, query):
+        if len(query) < GRAM_SIZE:
+            return [value for value in self.postings if query in value]
+
+        candidates = None
+        for gram in sorted(grams(query), key=lambda g: len(self.grams.get(g, ()))):
+            values = self.grams.get(gram)
+            if not values:
+                return []
+            candidates = values if candidates is None else candidates & values
+
+        return [value for value in candidates if query in value]
+
+    def search(self, query):
+        result = set()
+        for value in self.matching_values(query):
+            result |= self.postings[value]
+        return result
+
+class SearchIndex:
+    def __init__(self, width, key_index, rows=()):
+        self.key_index = key_index
+        self.columns = [ColumnIndex() for _ in range(width)]
+        self.build(rows)
+
+    def build(self, rows):
+        postings = [column.postings for column in self.columns]
+        key_index = self.key_index
+
+        for row in rows:
+            key = row[key_index]
+            for column_postings, value in zip(postings, row):
+                value = value.lower()
+                keys = column_postings.get(value)
+                if keys is None:
+                    column_postings[value] = {key}
+                else:
+                    keys.add(key)
+
+        for column in self.columns:
+            column_grams = column.grams
+            for value in column.postings:
+                for i in range(len(value) - GRAM_SIZE + 1):
+                    gram = value[i:i + GRAM_SIZE]
+                    values = column_grams.get(gram)
+                    if values is None:
+                        column_grams[gram] = {value}
+                    else:
+                        values.add(value)
+
+    def add(self, row):
+        key = row[self.key_index]
+        for column, value in zip(self.columns, row):
+            column.add(value.lower(), key)
+
+    def remove(self, row):
+        key = row[self.key_index]
+        for column, value in zip(self.columns, row):
+            column.remove(value.lower(), key)
+
+    def replace(self, old_row, new_row):
+        if old_row is None:
+            self.add(new_row)
+            return
+
+        old_key, new_key = old_row[self.key_index], new_row[self.key_index]
+        for column, old_value, new_value in zip(self.columns, old_row, new_row):
+            if old_key != new_key or old_value != new_value:
+                column.remove(old_value.lower(), old_key)
+                column.add(new_value.lower(), new_key)
+
+    def search(self, query, column=None):
+        query = query.lower()
+
+        if column is not None:
+            return self.columns[column].search(query)
+
+        result = set()
+        for column_index in self.columns:
+            result |= column_index.search(query)
+        return result
@@ -0,0 +1,105 @@
+import os
+import sys
+import struct
+import marshal
+import hashlib
+import threading
+
+# binary copies of the CSV files, read instead of parsing when the CSV hasn't changed
+SNAPSHOT_DIR = "cache"
+SNAPSHOT_VERSION = 1
+# rows per marshalled block, so loading can hand out the first rows before reading the rest
+CHUNK_SIZE = 50_000
+
+# SSIS_SNAPSHOTS=0 always parses the CSV files
+USE_SNAPSHOTS = os.environ.get("SSIS_SNAPSHOTS", "1") != "0"
+
+# every block is its length followed by one marshalled value
+LENGTH = struct.Struct("<Q")
+
+# marshal data is only readable by the Python version that wrote it
+FORMAT = (SNAPSHOT_VERSION, marshal.version, sys.version_info[:2])
+
+def snapshot_path(file_path):
+    directory, name = os.path.split(file_path)
+    return os.path.join(directory, SNAPSHOT_DIR, name + ".snapshot")
+
+def content_hash(file_path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_block(file):
+    size = file.read(LENGTH.size)
+    if len(size) != LENGTH.size:
+        raise EOFError("snapshot is cut short")
+    return marshal.loads(file.read(LENGTH.unpack(size)[0]))
+
+def write_block(file, value):
+    data = marshal.dumps(value)
+    file.write(LENGTH.pack(len(data)))
+    file.write(data)
+
+def read_snapshot(file_path, stat):
+    # returns (header, row count, iterator over row chunks), or None when the snapshot is missing or stale
+    try:
+        file = open(snapshot_path(file_path), "rb")
+    except OSError:
+        return None
+
+    try:
+        info = read_block(file)
+        if info["format"] != FORMAT or info["size"] != stat.st_size:
+            file.close()
+            return None
+        # a touched but unchanged file still matches on content
+        if info["mtime_ns"] != stat.st_mtime_ns and info["hash"] != content_hash(file_path):
+            file.close()
+            return None
+    except (OSError, EOFError, ValueError, TypeError, KeyError) as e:
+        print(f"Ignoring snapshot of {file_path}: {str(e)}")
+        file.close()
+        return None
+
+    return info["header"], info["rows"], read_chunks(file, info["chunks"])
+
+def read_chunks(file, count):
+    with file:
+        for _ in range(count):
+            yield read_block(file)
+
+def write_snapshot(file_path, stat, header, rows):
+    path = snapshot_path(file_path)
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    chunks = [rows[start:start + CHUNK_SIZE] for start in range(0, len(rows), CHUNK_SIZE)]
+
+    try:
+        digest = content_hash(file_path)
+        current = os.stat(file_path)
+        if (current.st_mtime_ns, current.st_size) != (stat.st_mtime_ns, stat.st_size):
+            # changed while it was being read; the next load takes another snapshot
+            return False
+
+        info = {"format": FORMAT, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest,
+                "header": list(header), "rows": len(rows), "chunks": len(chunks)}
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, "wb") as file:
+            write_block(file, info)
+            for chunk in chunks:
+                write_block(file, chunk)
+        os.replace(temp_path, path)
+        return True
+    except (OSError, ValueError) as e:
+        print(f"Error writing snapshot of {file_path}: {str(e)}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+def write_snapshot_in_background(file_path, stat, header, rows):
+    thread = threading.Thread(target=write_snapshot, args=(file_path, stat, header, rows),
+                              name=f"snapshot {file_path}", daemon=True)
+    thread.start()
+    return thread
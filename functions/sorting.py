@@ -0,0 +1,140 @@
+import re
+from bisect import insort
+from itertools import groupby, chain, accumulate
+
+ID_PARTS = re.compile(r'^(\d{4})-(\d{4})$')
+
+# dirty rows are put back one by one up to this many, past it the column is sorted again
+INSORT_LIMIT = 64
+
+# every key is a tuple led by 0 for well-formed values, so malformed ones sort after them
+def year_key(value):
+    try:
+        return (0, int(value))
+    except ValueError:
+        return (1, value.casefold())
+
+def id_key(value):
+    match = ID_PARTS.match(value)
+    if match:
+        return (0, int(match.group(1)), int(match.group(2)))
+    return (1, value.casefold())
+
+def text_key(value):
+    return value.casefold()
+
+COLUMN_KEYS = {
+    "Year Level": year_key,
+    "ID Number": id_key,
+}
+
+def key_function(column_name):
+    return COLUMN_KEYS.get(column_name, text_key)
+
+def reverse_stable(rows, keys):
+    # descending order that keeps equal keys in source order: reverse the runs, not the rows in them
+    runs = [list(run) for _, run in groupby(rows, keys.__getitem__)]
+    runs.reverse()
+    return list(chain.from_iterable(runs))
+
+class ColumnOrder:
+    def __init__(self, keys):
+        self.keys = keys
+        self.ascending = None
+        self.descending = None
+        # rows whose key changed, or that are new, since the orders were built
+        self.dirty = set()
+
+    def rows(self, descending=False):
+        if self.ascending is None:
+            self.ascending = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+            self.dirty.clear()
+        elif self.dirty:
+            self.repair()
+
+        if not descending:
+            return self.ascending
+        if self.descending is None:
+            self.descending = reverse_stable(self.ascending, self.keys)
+        return self.descending
+
+    def repair(self):
+        keys, dirty = self.keys, self.dirty
+        self.descending = None
+
+        if len(dirty) > INSORT_LIMIT:
+            self.ascending = sorted(range(len(keys)), key=keys.__getitem__)
+        else:
+            # the rest still has its old keys, so it stays sorted
+            rows = [row for row in self.ascending if row not in dirty]
+            for row in sorted(dirty):
+                insort(rows, row, key=lambda r: (keys[r], r))
+            self.ascending = rows
+        dirty.clear()
+
+    def append(self, first, keys):
+        self.keys.extend(keys)
+        self.dirty.update(range(first, first + len(keys)))
+
+    def change(self, row, key):
+        if self.keys[row] != key:
+            self.keys[row] = key
+            self.dirty.add(row)
+
+    def remove(self, row):
+        del self.keys[row]
+        self.dirty = {r - (r > row) for r in self.dirty if r != row}
+        if self.ascending is not None:
+            self.ascending = [r - (r > row) for r in self.ascending if r != row]
+        self.descending = None
+
+    def remove_rows(self, rows):
+        # one pass for a whole batch: each kept row moves up by the number of removed rows before it
+        kept = [True] * len(self.keys)
+        for row in sorted(rows, reverse=True):
+            kept[row] = False
+            del self.keys[row]
+        new_rows = list(accumulate(kept))
+        self.dirty = {new_rows[r] - 1 for r in self.dirty if kept[r]}
+        if self.ascending is not None:
+            self.ascending = [new_rows[r] - 1 for r in self.ascending if kept[r]]
+        self.descending = None
+
+class SortCache:
+    def __init__(self, model):
+        self.model = model
+        # column -> ColumnOrder, built the first time the column is sorted
+        self.columns = {}
+
+    def reset(self):
+        self.columns.clear()
+
+    def column(self, column):
+        order = self.columns.get(column)
+        if order is None:
+            key = key_function(self.model.header[column])
+            order = self.columns[column] = ColumnOrder([key(values[column]) for values in self.model.rows])
+        return order
+
+    def keys(self, column):
+        return self.column(column).keys
+
+    def rows(self, column, descending=False):
+        return self.column(column).rows(descending)
+
+    def rows_appended(self, first, rows):
+        for column, order in self.columns.items():
+            key = key_function(self.model.header[column])
+            order.append(first, [key(values[column]) for values in rows])
+
+    def row_changed(self, row, values):
+        for column, order in self.columns.items():
+            order.change(row, key_function(self.model.header[column])(values[column]))
+
+    def row_removed(self, row):
+        for order in self.columns.values():
+            order.remove(row)
+
+    def rows_removed(self, rows):
+        for order in self.columns.values():
+            order.remove_rows(rows)
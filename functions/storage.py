@@ -0,0 +1,396 @@
+import csv
+import os
+import json
+import sqlite3
+import threading
+from collections import namedtuple
+from functions.csv_operations import write_csv
+from functions.journal import Journal, INSERT, UPDATE, DELETE
+from functions.schema import PRIMARY_KEYS, DEPENDENCY_MAP, NULL
+from functions.records import row_packer
+from functions.snapshot import USE_SNAPSHOTS, snapshot_path, read_snapshot, write_snapshot, write_snapshot_in_background
+from functions.profiling import profiled, add_bytes
+
+# cascade marks changes that follow from a parent change through DEPENDENCY_MAP
+Change = namedtuple("Change", ["operation", "file_path", "key", "row", "cascade"])
+
+def key_index_of(file_path, header):
+    return header.index(PRIMARY_KEYS[file_path]) if file_path in PRIMARY_KEYS else 0
+
+class Storage:
+    # whether other programs may edit the files behind the tables
+    watchable = False
+
+    @profiled("storage.load")
+    def load(self, file_path, base=None, replay=True):
+        header, rows = self.scan(file_path)
+        key_index = key_index_of(file_path, header)
+        records = {row[key_index]: row for row in rows}
+        if replay:
+            self.replay(file_path, records, key_index, len(header), row_packer(header), base)
+        return header, records
+
+    def scan(self, file_path):
+        # the header, and an iterator over the stored rows in file order, packed by row_packer
+        raise NotImplementedError
+
+    def replay(self, file_path, records, key_index, width, pack=tuple, base=None):
+        return 0
+
+    def count(self, file_path):
+        # number of rows without loading them, or None when it can't be told cheaply
+        return None
+
+    def changed_on_disk(self, file_path):
+        return False
+
+    def commit(self, changes):
+        # True once written, False if it may work later, None if the changes are refused for good
+        raise NotImplementedError
+
+    def pending(self, file_path):
+        return 0
+
+    def backlog(self, file_path):
+        return 0
+
+    def write_base(self, file_path, header, rows):
+        return True
+
+    def discard(self, file_path, offset):
+        pass
+
+    def close(self):
+        pass
+
+def count_lines(file_path):
+    lines = 0
+    last = b"\n"
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return lines + (last != b"\n")
+
+def read_header(file_path):
+    with open(file_path, newline="", encoding="utf-8-sig") as file:
+        return [h.strip() for h in next(csv.reader(file), None) or []]
+
+class CsvStorage(Storage):
+    # row counts of the base files, valid while their mtime and size match
+    METADATA_FILE = "metadata.json"
+
+    watchable = True
+
+    def __init__(self):
+        self.journals = {}
+        self.metadata = None
+        self.metadata_lock = threading.Lock()
+        # file path -> (mtime, size) of the base file as last read or written
+        self.stamps = {}
+        self.stamp_lock = threading.Lock()
+
+    def journal(self, file_path):
+        if file_path not in self.journals:
+            self.journals[file_path] = Journal(file_path)
+        return self.journals[file_path]
+
+    def scan(self, file_path):
+        file = open(file_path, newline="", encoding="utf-8-sig")
+        stat = os.fstat(file.fileno())
+        self.stamps[file_path] = (stat.st_mtime_ns, stat.st_size)
+
+        snapshot = read_snapshot(file_path, stat) if USE_SNAPSHOTS else None
+        if snapshot is not None:
+            file.close()
+            header, rows, chunks = snapshot
+            add_bytes("storage.scan", read=os.path.getsize(snapshot_path(file_path)))
+            return header, self.snapshot_rows(file_path, stat, rows, chunks)
+
+        add_bytes("storage.scan", read=stat.st_size)
+        reader = csv.reader(file)
+        header = [h.strip() for h in next(reader, None) or []]
+        return header, self.clean_rows(file_path, file, stat, reader, header)
+
+    def snapshot_rows(self, file_path, stat, rows, chunks):
+        for chunk in chunks:
+            yield from chunk
+        self.remember_count(file_path, stat, rows)
+
+    def clean_rows(self, file_path, file, stat, reader, header):
+        width = len(header)
+        pack = row_packer(header)
+        rows = []
+        with file:
+            for row in reader:
+                if not row:
+                    continue
+                values = [value.strip() for value in row[:width]]
+                if len(values) < width:
+                    values.extend([""] * (width - len(values)))
+                values = pack(values)
+                rows.append(values)
+                yield values
+        self.remember_count(file_path, stat, len(rows))
+        # the next start reads the snapshot instead of parsing the file again
+        if USE_SNAPSHOTS:
+            write_snapshot_in_background(file_path, stat, header, rows)
+
+    def metadata_path(self, file_path):
+        return os.path.join(os.path.dirname(file_path), self.METADATA_FILE)
+
+    def read_metadata(self, file_path):
+        if self.metadata is None:
+            try:
+                with open(self.metadata_path(file_path), "r", encoding="utf-8") as file:
+                    self.metadata = json.load(file)
+            except (OSError, ValueError):
+                self.metadata = {}
+        return self.metadata
+
+    def remember_count(self, file_path, stat, rows):
+        with self.metadata_lock:
+            metadata = self.read_metadata(file_path)
+            metadata[file_path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "rows": rows}
+
+            temp_path = self.metadata_path(file_path) + ".tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    json.dump(metadata, file)
+                os.replace(temp_path, self.metadata_path(file_path))
+            except OSError as e:
+                print(f"Error writing {self.metadata_path(file_path)}: {str(e)}")
+
+    def count(self, file_path):
+        rows = self.base_count(file_path)
+        journal = self.journal(file_path)
+        if rows is None or not journal.size():
+            return rows
+
+        # the journal may add or remove rows the base file doesn't show
+        header = read_header(file_path)
+        return rows + journal.net_rows(key_index_of(file_path, header), len(header))
+
+    def base_count(self, file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        with self.metadata_lock:
+            cached = self.read_metadata(file_path).get(file_path)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            return cached["rows"]
+
+        rows = max(count_lines(file_path) - 1, 0)
+        self.remember_count(file_path, stat, rows)
+        return rows
+
+    def changed_on_disk(self, file_path):
+        with self.stamp_lock:
+            return self.stamp_differs(file_path)
+
+    def stamp_differs(self, file_path):
+        stamp = self.stamps.get(file_path)
+        if stamp is None:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return True
+        return (stat.st_mtime_ns, stat.st_size) != stamp
+
+    def replay(self, file_path, records, key_index, width, pack=tuple, base=None):
+        return self.journal(file_path).replay(records, key_index, width, pack, base)
+
+    def commit(self, changes):
+        entries = {}
+        for change in changes:
+            row = [] if change.operation == DELETE else change.row
+            entries.setdefault(change.file_path, []).append((change.operation, change.key, row))
+
+        for file_path, file_entries in entries.items():
+            if not self.journal(file_path).append(file_entries):
+                return False
+        return True
+
+    def pending(self, file_path):
+        return self.journal(file_path).size()
+
+    def backlog(self, file_path):
+        return self.journal(file_path).entries
+
+    def write_base(self, file_path, header, rows):
+        temp_path = file_path + ".tmp"
+        try:
+            write_csv(temp_path, header, rows)
+            # swapping the file and its stamp together keeps our own write from looking like an outside one
+            with self.stamp_lock:
+                # the journal stays until the outside edit has been read back in
+                if self.stamp_differs(file_path):
+                    print(f"Not compacting {file_path}: it was changed by another program")
+                    os.remove(temp_path)
+                    return False
+                os.replace(temp_path, file_path)
+                stat = os.stat(file_path)
+                self.stamps[file_path] = (stat.st_mtime_ns, stat.st_size)
+            self.remember_count(file_path, stat, len(rows))
+            if USE_SNAPSHOTS:
+                write_snapshot(file_path, stat, header, rows)
+            return True
+        except OSError as e:
+            print(f"Error compacting {file_path}: {str(e)}")
+            return False
+
+    def discard(self, file_path, offset):
+        self.journal(file_path).discard(offset)
+
+class SqliteStorage(Storage):
+    def __init__(self, db_path="data/ssis.db"):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.lock = threading.Lock()
+        self.headers = {}
+
+    @staticmethod
+    def table_name(file_path):
+        return os.path.splitext(os.path.basename(file_path))[0]
+
+    @staticmethod
+    def quote(name):
+        return '"' + name.replace('"', '""') + '"'
+
+    @staticmethod
+    def to_sql(value):
+        return None if value == NULL else value
+
+    def create_schema(self, headers):
+        # parents first so the foreign keys have something to point at
+        references = {entry["file"]: (parent, entry) for parent, entry in DEPENDENCY_MAP.items()}
+        order = sorted(headers, key=lambda file_path: self.depth(file_path, references))
+
+        with self.lock, self.connection:
+            for file_path in order:
+                columns = []
+                for column in headers[file_path]:
+                    definition = f"{self.quote(column)} TEXT"
+                    if column == PRIMARY_KEYS.get(file_path):
+                        definition += " PRIMARY KEY"
+                    if file_path in references and column == references[file_path][1]["child_key"]:
+                        parent, entry = references[file_path]
+                        definition += (f" REFERENCES {self.quote(self.table_name(parent))}({self.quote(entry['key'])})"
+                                       " ON UPDATE CASCADE ON DELETE SET NULL")
+                    columns.append(definition)
+
+                table = self.table_name(file_path)
+                self.connection.execute(f"CREATE TABLE IF NOT EXISTS {self.quote(table)} ({', '.join(columns)})")
+
+                if file_path in references:
+                    child_key = references[file_path][1]["child_key"]
+                    self.connection.execute(f"CREATE INDEX IF NOT EXISTS {self.quote(table + '_' + child_key)} "
+                                            f"ON {self.quote(table)}({self.quote(child_key)})")
+
+    @staticmethod
+    def depth(file_path, references):
+        depth = 0
+        while file_path in references:
+            file_path = references[file_path][0]
+            depth += 1
+        return depth
+
+    def scan(self, file_path):
+        with self.lock:
+            cursor = self.connection.execute(f"SELECT * FROM {self.quote(self.table_name(file_path))} ORDER BY rowid")
+            header = [column[0] for column in cursor.description]
+            self.headers[file_path] = header
+        return header, self.fetch_rows(cursor, row_packer(header))
+
+    def count(self, file_path):
+        with self.lock:
+            return self.connection.execute(f"SELECT COUNT(*) FROM {self.quote(self.table_name(file_path))}").fetchone()[0]
+
+    def fetch_rows(self, cursor, pack):
+        while True:
+            # the connection is shared, so only hold the lock per batch
+            with self.lock:
+                batch = cursor.fetchmany(1000)
+            if not batch:
+                return
+            for row in batch:
+                yield pack([NULL if value is None else str(value) for value in row])
+
+    def commit(self, changes):
+        try:
+            with self.lock, self.connection:
+                for change in changes:
+                    # the foreign keys apply cascades inside the same transaction
+                    if change.cascade:
+                        continue
+                    self.execute(change)
+        except sqlite3.IntegrityError as e:
+            print(f"Error writing to {self.db_path}: {str(e)}")
+            return None
+        except sqlite3.Error as e:
+            print(f"Error writing to {self.db_path}: {str(e)}")
+            return False
+        return True
+
+    def execute(self, change):
+        table = self.quote(self.table_name(change.file_path))
+        key_column = self.quote(PRIMARY_KEYS[change.file_path])
+
+        if change.operation == DELETE:
+            self.connection.execute(f"DELETE FROM {table} WHERE {key_column} = ?", (change.key,))
+            return
+
+        values = [self.to_sql(value) for value in change.row]
+
+        if change.operation == INSERT:
+            placeholders = ", ".join("?" for _ in values)
+            self.connection.execute(f"INSERT INTO {table} VALUES ({placeholders})", values)
+        elif change.operation == UPDATE:
+            if change.file_path not in self.headers:
+                self.headers[change.file_path] = [column[1] for column in self.connection.execute(f"PRAGMA table_info({table})")]
+            assignments = ", ".join(f"{self.quote(column)} = ?" for column in self.headers[change.file_path])
+            self.connection.execute(f"UPDATE {table} SET {assignments} WHERE {key_column} = ?", (*values, change.key))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+def migrate_csv_to_sqlite(db_path="data/ssis.db", file_paths=None):
+    if os.path.exists(db_path):
+        print(f"{db_path} already exists, not migrating")
+        return False
+
+    file_paths = file_paths or list(PRIMARY_KEYS)
+    source = CsvStorage()
+    tables = {file_path: source.load(file_path) for file_path in file_paths}
+
+    target = SqliteStorage(db_path)
+    target.create_schema({file_path: header for file_path, (header, _) in tables.items()})
+
+    # rows are copied as they are, dangling codes included
+    target.connection.execute("PRAGMA foreign_keys = OFF")
+    with target.lock, target.connection:
+        for file_path, (header, records) in tables.items():
+            placeholders = ", ".join("?" for _ in header)
+            target.connection.executemany(
+                f"INSERT INTO {target.quote(target.table_name(file_path))} VALUES ({placeholders})",
+                ([target.to_sql(value) for value in row] for row in records.values()))
+    target.connection.execute("PRAGMA foreign_keys = ON")
+
+    target.close()
+    return True
+
+def open_storage():
+    if os.environ.get("SSIS_STORAGE", "csv").lower() == "sqlite":
+        db_path = os.environ.get("SSIS_DATABASE", "data/ssis.db")
+        if not os.path.exists(db_path):
+            migrate_csv_to_sqlite(db_path)
+        return SqliteStorage(db_path)
+    return CsvStorage()
+
+if __name__ == "__main__":
+    migrate_csv_to_sqlite(os.environ.get("SSIS_DATABASE", "data/ssis.db"))
@@ -0,0 +1,507 @@
+import threading
+from itertools import islice
+from operator import itemgetter
+from contextlib import contextmanager
+from functions.journal import INSERT, UPDATE, DELETE
+from functions.schema import DEPENDENCY_MAP, NULL
+from functions.storage import Change, open_storage, key_index_of
+from functions.records import row_packer, rename_key
+from functions.search_index import SearchIndex
+from functions.writer import Writer
+from functions.aggregates import Aggregates
+from functions.profiling import profiled
+
+# child file -> parent file for every DEPENDENCY_MAP edge
+PARENT_FILES = {entry["file"]: parent for parent, entry in DEPENDENCY_MAP.items()}
+
+class Table:
+    def __init__(self, file_path, header, rows, store, base=None):
+        self.file_path = file_path
+        self.header = header
+        self.key_index = key_index_of(file_path, header)
+        # key -> row tuple in header order
+        self.rows = rows
+        # key -> row as the base file holds it (None if it doesn't), for every key changed since the
+        # last compaction; lets sync tell our changes from an outside edit. None when nothing edits the files
+        self.base = base
+        self.pack = row_packer(header)
+        # journal entries applied on top of the base file at load
+        self.replayed = 0
+
+        self.store = store
+
+        self.version = 0
+
+        self._sorted_keys = None
+        self._folded_keys = None
+        self._search_index = None
+        self._search_builder = None
+        # (old row, new row) for each change made while the builder runs, replayed on its index
+        self._index_changes = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def get(self, key):
+        return self.rows.get(key)
+
+    def get_dict(self, key):
+        row = self.rows.get(key)
+        return dict(zip(self.header, row)) if row else None
+
+    def sorted_keys(self):
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self.rows)
+        return self._sorted_keys
+
+    def canonical_key(self, text):
+        # case-insensitive lookup returning the key as it is stored
+        if text in self.rows:
+            return text
+        if self._folded_keys is None:
+            self._folded_keys = {key.casefold(): key for key in self.rows}
+        return self._folded_keys.get(text.casefold())
+
+    def search_index(self):
+        # a search that comes before the background build ends waits for it instead of building a second index
+        builder = self._search_builder
+        if builder is not None:
+            builder.join()
+        if self._search_index is None:
+            with self.store.lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex(len(self.header), self.key_index, self.rows.values())
+        return self._search_index
+
+    def search_ready(self):
+        return self._search_builder is None
+
+    def search(self, query, column=None):
+        return self.search_index().search(query, column)
+
+    def prepare_search(self):
+        if self._search_index is not None or self._search_builder is not None:
+            return
+
+        def build(rows):
+            try:
+                index = SearchIndex(len(self.header), self.key_index, rows)
+            except Exception as e:
+                print(f"Error indexing {self.file_path}: {str(e)}")
+                index = None
+
+            with self.store.lock:
+                # changes made since the snapshot are caught up on rather than building again
+                if index is not None:
+                    for old_row, new_row in self._index_changes:
+                        if new_row is None:
+                            index.remove(old_row)
+                        else:
+                            index.replace(old_row, new_row)
+                    self._search_index = index
+                self._index_changes = None
+                self._search_builder = None
+
+        with self.store.lock:
+            rows = list(self.rows.values())
+            self._index_changes = []
+            self._search_builder = threading.Thread(target=build, args=(rows,), name=f"index {self.file_path}", daemon=True)
+        self._search_builder.start()
+
+    def index_changed(self, old_row, new_row):
+        if self._search_index is not None:
+            if new_row is None:
+                self._search_index.remove(old_row)
+            else:
+                self._search_index.replace(old_row, new_row)
+        elif self._index_changes is not None:
+            self._index_changes.append((old_row, new_row))
+
+    def put(self, key, row):
+        self.version += 1
+        self.index_changed(self.rows.get(key), row)
+
+        new_key = row[self.key_index]
+        if new_key != key:
+            rename_key(self.rows, key, new_key, row)
+            self.keys_changed()
+            return
+        if key not in self.rows:
+            self.keys_changed()
+        self.rows[new_key] = row
+
+    def remove(self, key):
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+
+        self.version += 1
+        self.keys_changed()
+        self.index_changed(row, None)
+
+    def remember_base(self, key):
+        if self.base is not None and key not in self.base:
+            self.base[key] = self.rows.get(key)
+
+    def keys_changed(self):
+        self._sorted_keys = None
+        self._folded_keys = None
+
+    def compact(self):
+        storage = self.store.storage
+
+        with self.store.lock:
+            offset = storage.pending(self.file_path)
+            if offset == 0:
+                return True
+            rows = list(self.rows.values())
+            # what is written becomes the base; changes from here on are remembered against it
+            written_base, self.base = self.base, {} if self.base is not None else None
+
+        if not storage.write_base(self.file_path, self.header, rows):
+            with self.store.lock:
+                if written_base is not None:
+                    written_base.update((key, row) for key, row in self.base.items() if key not in written_base)
+                    self.base = written_base
+            return False
+
+        with self.store.lock:
+            storage.discard(self.file_path, offset)
+        return True
+
+class RecordStore:
+    def __init__(self, storage=None):
+        self.storage = storage or open_storage()
+        self.tables = {}
+        self.lock = threading.RLock()
+
+        # file path -> event set once a streaming load of that file ends
+        self.loading = {}
+
+        # parent file -> parent key -> keys of the child rows pointing at it
+        self.references = {}
+
+        # commits land in memory at once and reach the storage from here
+        self.writer = Writer(self)
+        self.aggregates = Aggregates(self)
+        # changes held back while a batch is open, None outside one
+        self.batched = None
+
+    def table(self, file_path):
+        loading = self.loading.get(file_path)
+        if loading is not None:
+            loading.wait()
+
+        if file_path not in self.tables:
+            base = {} if self.storage.watchable else None
+            header, rows = self.storage.load(file_path, base)
+            self.tables[file_path] = Table(file_path, header, rows, self, base)
+        return self.tables[file_path]
+
+    def count(self, file_path):
+        # None when it can't be told without loading the table
+        if file_path in self.tables:
+            return len(self.tables[file_path])
+        return self.storage.count(file_path)
+
+    def stream(self, file_path, chunk_size=2000):
+        # yields (header, rows) chunks in file order and publishes the table at the end
+        with self.lock:
+            loaded = file_path in self.tables or file_path in self.loading
+            if not loaded:
+                self.loading[file_path] = threading.Event()
+
+        if loaded:
+            table = self.table(file_path)
+            yield list(table.header), list(table.rows.values())
+            return
+
+        try:
+            header, rows = self.storage.scan(file_path)
+            key_index = key_index_of(file_path, header)
+
+            # chunked without a Python step per row; the last chunk is short, possibly empty
+            rows = iter(rows)
+            key = itemgetter(key_index)
+            records = {}
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                records.update(zip(map(key, chunk), chunk))
+                yield header, chunk
+                if len(chunk) < chunk_size:
+                    break
+
+            base = {} if self.storage.watchable else None
+            replayed = self.storage.replay(file_path, records, key_index, len(header), row_packer(header), base)
+            with self.lock:
+                table = self.tables[file_path] = Table(file_path, header, records, self, base)
+                table.replayed = replayed
+        finally:
+            self.loading.pop(file_path).set()
+
+    def insert(self, file_path, row):
+        table = self.table(file_path)
+        key = row[table.key_index]
+        if key in table:
+            return None
+        return self.commit([Change(INSERT, file_path, key, row, False)])
+
+    def insert_many(self, file_path, rows):
+        table = self.table(file_path)
+        keys = [row[table.key_index] for row in rows]
+        if len(set(keys)) != len(keys) or any(key in table for key in keys):
+            return None
+        return self.commit([Change(INSERT, file_path, key, row, False) for key, row in zip(keys, rows)])
+
+    def update(self, file_path, key, row):
+        table = self.table(file_path)
+        if key not in table:
+            return None
+
+        changes = [Change(UPDATE, file_path, key, row, False)]
+
+        new_key = row[table.key_index]
+        if new_key != key:
+            if new_key in table:
+                return None
+            changes.extend(self.cascade(file_path, key, new_key))
+
+        return self.commit(changes)
+
+    def update_many(self, file_path, keys, column, value):
+        # sets one non-key column on every row in keys; returns [] when nothing differs
+        table = self.table(file_path)
+        index = table.header.index(column)
+        if index == table.key_index or any(key not in table for key in keys):
+            return None
+
+        changes = []
+        for key in dict.fromkeys(keys):
+            row = table.get(key)
+            if row[index] != value:
+                new_row = list(row)
+                new_row[index] = value
+                changes.append(Change(UPDATE, file_path, key, new_row, False))
+
+        return self.commit(changes) if changes else []
+
+    def delete(self, file_path, key):
+        return self.delete_many(file_path, [key])
+
+    def delete_many(self, file_path, keys):
+        table = self.table(file_path)
+        keys = list(dict.fromkeys(keys))
+        if not keys or any(key not in table for key in keys):
+            return None
+
+        changes = self.cascade_many(file_path, keys, NULL)
+        changes.extend(Change(DELETE, file_path, key, table.get(key), False) for key in keys)
+
+        return self.commit(changes)
+
+    def cascade(self, file_path, key, new_value):
+        return self.cascade_many(file_path, [key], new_value)
+
+    @profiled("cascade")
+    def cascade_many(self, file_path, keys, new_value):
+        if file_path not in DEPENDENCY_MAP:
+            return []
+
+        child_file = DEPENDENCY_MAP[file_path]["file"]
+        child_key = DEPENDENCY_MAP[file_path]["child_key"]
+
+        child_table = self.table(child_file)
+        child_index = child_table.header.index(child_key)
+
+        # every child row of any of the keys, each changed once
+        references = self.reference_index(file_path)
+        children = set().union(*(references.get(key, ()) for key in keys))
+
+        changes = []
+        for child_id in sorted(children):
+            new_row = list(child_table.get(child_id))
+            new_row[child_index] = new_value
+            changes.append(Change(UPDATE, child_file, child_id, new_row, True))
+        return changes
+
+    def children_of(self, file_path, key):
+        references = self.reference_index(file_path)
+        if references is None:
+            return set()
+        return set(references.get(key, ()))
+
+    def reference_index(self, file_path):
+        if file_path not in DEPENDENCY_MAP:
+            return None
+
+        if file_path not in self.references:
+            child_table = self.table(DEPENDENCY_MAP[file_path]["file"])
+            child_index = child_table.header.index(DEPENDENCY_MAP[file_path]["child_key"])
+
+            references = {}
+            for child_id, row in child_table.rows.items():
+                keys = references.get(row[child_index])
+                if keys is None:
+                    references[row[child_index]] = {child_id}
+                else:
+                    keys.add(child_id)
+            self.references[file_path] = references
+
+        return self.references[file_path]
+
+    def update_references(self, file_path, old_row, new_row):
+        parent_file = PARENT_FILES.get(file_path)
+        if parent_file not in self.references:
+            return
+
+        references = self.references[parent_file]
+        table = self.tables[file_path]
+        child_index = table.header.index(DEPENDENCY_MAP[parent_file]["child_key"])
+
+        if old_row is not None:
+            keys = references.get(old_row[child_index])
+            if keys is not None:
+                keys.discard(old_row[table.key_index])
+                if not keys:
+                    del references[old_row[child_index]]
+
+        if new_row is not None:
+            references.setdefault(new_row[child_index], set()).add(new_row[table.key_index])
+
+    @profiled("store.commit")
+    def commit(self, changes):
+        touched = {change.file_path for change in changes}
+
+        with self.lock:
+            # rows edited from stale data would undo what the other program wrote
+            stale = [file_path for file_path in touched if self.storage.changed_on_disk(file_path)]
+            if stale:
+                print(f"Not saving: {', '.join(sorted(stale))} changed on disk, sync before editing")
+                return None
+
+            # the store, the views and the journal all share the packed rows
+            changes = [change if change.operation == DELETE else change._replace(row=self.table(change.file_path).pack(change.row))
+                       for change in changes]
+            self.apply(changes)
+            if self.batched is not None:
+                self.batched.extend(changes)
+            else:
+                self.writer.submit(changes)
+
+        return changes
+
+    @contextmanager
+    def batch(self):
+        # commits inside reach memory at once and the storage as one write at the end
+        with self.lock:
+            self.batched = []
+        try:
+            yield
+        finally:
+            with self.lock:
+                changes, self.batched = self.batched, None
+            if changes:
+                self.writer.submit(changes)
+
+    def apply(self, changes):
+        for change in changes:
+            table = self.table(change.file_path)
+            old_row = table.get(change.key)
+            table.remember_base(change.key)
+            if change.operation != DELETE:
+                table.remember_base(change.row[table.key_index])
+            if change.operation == DELETE:
+                table.remove(change.key)
+                self.update_references(change.file_path, old_row, None)
+                self.aggregates.changed(change.file_path, old_row, None)
+            else:
+                table.put(change.key, change.row)
+                self.update_references(change.file_path, old_row, change.row)
+                self.aggregates.changed(change.file_path, old_row, change.row)
+
+    @profiled("store.sync")
+    def sync(self, file_path):
+        # reads back a file another program changed and applies only the rows that differ;
+        # None means the columns changed and the table was dropped to be loaded again
+        # what is read back has to include every change still waiting to be written
+        self.writer.flush()
+
+        with self.lock:
+            table = self.tables.get(file_path)
+            if table is None or file_path in self.loading or not self.storage.changed_on_disk(file_path):
+                return []
+
+            header, rows = self.storage.load(file_path, replay=False)
+            if header != table.header:
+                self.reload(file_path)
+                return None
+
+            # the journal is only replayed on rows the other program left as they were;
+            # where both changed a row, the outside edit wins
+            base = table.base or {}
+            kept = {}
+            conflicts = []
+            for key, base_row in base.items():
+                outside_row = rows.get(key)
+                current = table.get(key)
+                if outside_row != base_row:
+                    if outside_row != current:
+                        conflicts.append(key)
+                    continue
+                kept[key] = base_row
+                if current is None:
+                    rows.pop(key, None)
+                else:
+                    rows[key] = current
+            if conflicts:
+                print(f"{file_path} was changed by another program, keeping its version of {', '.join(sorted(conflicts))}")
+
+            changes = [Change(DELETE, file_path, key, row, False) for key, row in table.rows.items() if key not in rows]
+            for key, row in rows.items():
+                old_row = table.get(key)
+                if old_row is None:
+                    changes.append(Change(INSERT, file_path, key, row, False))
+                elif old_row != row:
+                    changes.append(Change(UPDATE, file_path, key, row, False))
+
+            # these are the other program's changes, already in the base file
+            table.base = None
+            self.apply(changes)
+            table.base = kept if self.storage.watchable else None
+
+        # the journal still holds the entries the outside edit replaced; writing the table out drops them
+        if base:
+            table.compact()
+        return changes
+
+    def compact(self):
+        self.writer.flush()
+        return all([table.compact() for table in self.tables.values()])
+
+    def reload(self, file_path=None):
+        self.aggregates.invalidate()
+        if file_path is None:
+            self.tables.clear()
+            self.references.clear()
+        else:
+            self.tables.pop(file_path, None)
+            self.references.pop(file_path, None)
+            self.references.pop(PARENT_FILES.get(file_path), None)
+
+    def close(self):
+        # False when some committed changes could not be written
+        flushed = self.writer.close()
+        self.compact()
+        self.storage.close()
+        return flushed
+
+_store = None
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = RecordStore()
+    return _store
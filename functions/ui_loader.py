@@ -0,0 +1,81 @@
+# python -m functions.ui_loader compiles every ui/*.ui ahead of time
+
+import os
+import sys
+import glob
+import hashlib
+import importlib.util
+from PyQt6 import uic
+
+COMPILED_DIR = "ui/compiled"
+HASH_PREFIX = "# ui source sha1: "
+
+# SSIS_UI_COMPILED=0 always parses the .ui files at runtime
+USE_COMPILED = os.environ.get("SSIS_UI_COMPILED", "1") != "0"
+
+# .ui path -> setup class, checked against the source once per process
+_classes = {}
+
+def source_hash(ui_path):
+    with open(ui_path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+def compiled_path(ui_path):
+    name = os.path.splitext(os.path.basename(ui_path))[0]
+    return os.path.join(COMPILED_DIR, f"{name}_ui.py")
+
+def is_fresh(py_path, digest):
+    try:
+        with open(py_path, "r", encoding="utf-8") as file:
+            return file.readline().strip() == HASH_PREFIX + digest
+    except OSError:
+        return False
+
+def compile_ui(ui_path, digest=None):
+    digest = digest or source_hash(ui_path)
+    py_path = compiled_path(ui_path)
+    os.makedirs(COMPILED_DIR, exist_ok=True)
+
+    temp_path = py_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(HASH_PREFIX + digest + "\n")
+        uic.compileUi(ui_path, file)
+    os.replace(temp_path, py_path)
+    return py_path
+
+def setup_class(ui_path):
+    if ui_path in _classes:
+        return _classes[ui_path]
+
+    digest = source_hash(ui_path)
+    py_path = compiled_path(ui_path)
+    if not is_fresh(py_path, digest):
+        compile_ui(ui_path, digest)
+
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(py_path))[0], py_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    setup = next(value for name, value in vars(module).items() if name.startswith("Ui_") and isinstance(value, type))
+    _classes[ui_path] = setup
+    return setup
+
+def load_ui(ui_path, widget):
+    # same result as uic.loadUi: every named child ends up as an attribute of the widget
+    if USE_COMPILED:
+        try:
+            form = setup_class(ui_path)()
+        except Exception as e:
+            print(f"Could not use compiled {ui_path}, loading it at runtime: {str(e)}")
+        else:
+            form.setupUi(widget)
+            for name, value in vars(form).items():
+                setattr(widget, name, value)
+            return widget
+
+    return uic.loadUi(ui_path, widget)
+
+if __name__ == "__main__":
+    ui_paths = sys.argv[1:] or sorted(glob.glob("ui/*.ui"))
+    for ui_path in ui_paths:
+        print(f"{ui_path} -> {compile_ui(ui_path)}")
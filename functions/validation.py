@@ -0,0 +1,72 @@
+import re
+from functions.schema import PRIMARY_KEYS, DEPENDENCY_MAP, FIELDS
+
+LETTERS_PATTERN = re.compile(r'^[A-Za-z\s\-]+$')
+ID_PATTERN = re.compile(r'^\d{4}-\d{4}$')
+
+YEAR_FIELDS = {"Year Level"}
+# field -> the values it may hold, as the edit dialog offers them
+CHOICE_FIELDS = {"Gender": ["Male", "Female", "Others", "Prefer not to say"]}
+# column holding a parent code -> file the code must exist in
+REFERENCE_FIELDS = {entry["child_key"]: parent for parent, entry in DEPENDENCY_MAP.items()}
+
+def text_error(key, text):
+    if key == "ID Number":
+        return None if ID_PATTERN.match(text) else "ID Number must contain 8 digits"
+    return None if LETTERS_PATTERN.match(text) else f"{key} must contain only letters"
+
+def year_error(value):
+    try:
+        year = int(value)
+    except ValueError:
+        return "Year level must be a number"
+
+    if year == 0:
+        return "Year level cannot be 0"
+    if not 0 < year < 10:
+        return "Year level must be between 1 and 9"
+    return None
+
+def code_error(key):
+    return f"Please choose a valid {key}."
+
+def duplicate_error(key):
+    return f"{key} already exists in records."
+
+def validate_value(key, value, store):
+    # returns the value as it should be stored, and the error if there is one
+    value = (value or "").strip()
+
+    if not value:
+        return value, f"{key} is empty"
+    if key in YEAR_FIELDS:
+        return value, year_error(value)
+    if key in REFERENCE_FIELDS:
+        canonical = store.table(REFERENCE_FIELDS[key]).canonical_key(value)
+        if canonical is None:
+            return value, code_error(key)
+        return canonical, None
+    if key in CHOICE_FIELDS:
+        for choice in CHOICE_FIELDS[key]:
+            if choice.casefold() == value.casefold():
+                return choice, None
+        return value, f"{key} must be one of {', '.join(CHOICE_FIELDS[key])}"
+    return value, text_error(key, value)
+
+def validate_record(file_path, record, store, pending_keys=()):
+    # returns the row in file order with codes in their stored case, and the errors found
+    row = []
+    errors = []
+
+    for key in FIELDS[file_path]:
+        value, error = validate_value(key, record.get(key), store)
+        if error:
+            errors.append(error)
+        row.append(value)
+
+    pk_field = PRIMARY_KEYS[file_path]
+    pk_value = row[FIELDS[file_path].index(pk_field)]
+    if pk_value and (pk_value in store.table(file_path) or pk_value in pending_keys):
+        errors.append(duplicate_error(pk_field))
+
+    return row, errors
@@ -0,0 +1,137 @@
+import atexit
+import threading
+from functions.profiling import profiled, measure
+
+# a file is compacted once its journal holds this many entries
+COMPACT_THRESHOLD = 500
+
+class Writer:
+    # persists committed changes on a background thread so callers never wait on disk
+    def __init__(self, store):
+        self.store = store
+
+        # change lists committed in memory but not written yet, oldest first
+        self.pending = []
+        self.condition = threading.Condition()
+        self.busy = False
+        # set after a failed write; the next submit or flush tries again
+        self.stalled = False
+        self.closed = False
+        self.thread = None
+
+        # called from the writer thread as listener(saved, file_paths, message)
+        self.listeners = []
+
+        atexit.register(self.close)
+
+    def submit(self, changes):
+        with self.condition:
+            self.pending.append(changes)
+            self.stalled = False
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="writer", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while (not self.pending or self.stalled) and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                # everything queued so far goes out in one write per file
+                batches, self.pending = self.pending, []
+                self.busy = True
+
+            unsaved = self.write(batches)
+
+            with self.condition:
+                if unsaved:
+                    self.pending[:0] = unsaved
+                    self.stalled = True
+                self.busy = False
+                self.condition.notify_all()
+
+    @profiled("writer.write")
+    def write(self, batches):
+        # returns the batches that still have to be written
+        saved = self.commit(batches)
+        if saved is False:
+            return batches
+        if saved is None:
+            if len(batches) == 1:
+                self.reject(batches)
+                return []
+            # find the commits the storage refuses and write the others without them
+            for index, batch in enumerate(batches):
+                saved = self.commit([batch])
+                if saved is False:
+                    return batches[index:]
+                if saved is None:
+                    self.reject([batch])
+        return []
+
+    def commit(self, batches):
+        changes = [change for batch in batches for change in batch]
+        file_paths = sorted({change.file_path for change in changes})
+
+        try:
+            saved = self.store.storage.commit(changes)
+        except Exception as e:
+            print(f"Error saving {', '.join(file_paths)}: {str(e)}")
+            saved = False
+
+        if saved is None:
+            return None
+
+        if not saved:
+            self.notify(False, file_paths, f"Could not save changes to {', '.join(file_paths)}, they will be retried")
+            return False
+
+        for file_path in file_paths:
+            table = self.store.tables.get(file_path)
+            if table is not None and self.store.storage.backlog(file_path) >= COMPACT_THRESHOLD:
+                with measure("writer.compact"):
+                    table.compact()
+
+        self.notify(True, file_paths, f"Saved {len(changes)} changes")
+        return True
+
+    def reject(self, batches):
+        # the storage will never take these, so memory goes back to what it holds
+        file_paths = sorted({change.file_path for batch in batches for change in batch})
+        with self.store.lock:
+            for file_path in file_paths:
+                self.store.reload(file_path)
+        self.notify(False, file_paths, f"Changes to {', '.join(file_paths)} were rejected and have been undone")
+
+    def notify(self, saved, file_paths, message):
+        for listener in list(self.listeners):
+            try:
+                listener(saved, file_paths, message)
+            except Exception as e:
+                print(f"Error in save listener: {str(e)}")
+
+    def flush(self, timeout=None):
+        # waits until everything committed so far is on disk; False if a write failed or time ran out
+        with self.condition:
+            if self.thread is None:
+                return not self.pending
+            self.stalled = False
+            self.condition.notify_all()
+            done = self.condition.wait_for(lambda: self.stalled or (not self.pending and not self.busy), timeout)
+            return done and not self.pending and not self.busy
+
+    def close(self):
+        flushed = self.flush()
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+        self.closed = False
+        if not flushed:
+            print(f"{sum(len(batch) for batch in self.pending)} changes could not be saved")
+        return flushed
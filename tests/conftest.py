@@ -0,0 +1,50 @@
+import os
+import shutil
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+import functions.store as store_module
+import functions.storage as storage_module
+from functions.storage import CsvStorage
+from functions.store import RecordStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    # a copy of the shipped CSV files; the store reads data/*.csv relative to the working directory
+    os.makedirs(tmp_path / "data")
+    for name in ("students.csv", "programs.csv", "colleges.csv"):
+        shutil.copy(os.path.join(ROOT, "data", name), tmp_path / "data" / name)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage_module, "USE_SNAPSHOTS", False)
+    return tmp_path / "data"
+
+@pytest.fixture
+def store(data_dir):
+    store = RecordStore(CsvStorage())
+    yield store
+    store.writer.close()
+
+@pytest.fixture
+def window(data_dir, monkeypatch):
+    os.symlink(os.path.join(ROOT, "ui"), "ui")
+    monkeypatch.setattr(store_module, "_store", None)
+    app = QApplication.instance() or QApplication([])
+
+    from MainWindow import MainWindow
+    window = MainWindow()
+    window.show()
+    for tab in (1, 2, 0):
+        window.tabWidget.setCurrentIndex(tab)
+        while window.loading:
+            app.processEvents()
+
+    yield window
+    window.hide()
+    window.saveNotifier.detach()
+    store_module.get_store().writer.close()
+    window.deleteLater()
+    app.processEvents()
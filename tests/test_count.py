@@ -0,0 +1,30 @@
+import os
+from functions.storage import CsvStorage
+from functions.store import RecordStore
+
+STUDENTS = "data/students.csv"
+
+def test_count_with_a_journal_does_not_load_the_table(store):
+    table = store.table(STUDENTS)
+    row = list(table.get("2020-1700"))
+    store.insert(STUDENTS, ["2030-0001"] + row[1:])
+    store.insert(STUDENTS, ["2030-0002"] + row[1:])
+    store.delete(STUDENTS, "2030-0001")
+    store.delete(STUDENTS, "2020-1486")
+    store.update(STUDENTS, "2020-1700", ["2030-0003"] + row[1:])
+    store.update(STUDENTS, "2030-0003", ["2030-0004"] + row[1:])
+    expected = len(table)
+    # stop without compacting, as if the app had quit before it got to it
+    store.writer.close()
+    assert os.path.exists(STUDENTS + ".journal")
+
+    restarted = RecordStore(CsvStorage())
+    assert restarted.count(STUDENTS) == expected
+    assert STUDENTS not in restarted.tables
+    assert len(restarted.table(STUDENTS)) == expected
+    restarted.writer.close()
+
+def test_count_of_a_missing_file_is_unknown(store):
+    os.remove(STUDENTS)
+    assert store.count(STUDENTS) is None
+    assert STUDENTS not in store.tables
@@ -0,0 +1,31 @@
+import os
+from functions.csv_operations import write_csv
+from tests.test_sync import read_rows
+
+PROGRAMS = "data/programs.csv"
+
+def show_dashboard(window):
+    window.tabWidget.setCurrentWidget(window.dashboard)
+    assert window.get_current_table() is None
+
+def test_columns_changed_on_disk_while_dashboard_shows(window):
+    show_dashboard(window)
+    header, rows = read_rows(PROGRAMS)
+    stat = os.stat(PROGRAMS)
+    write_csv(PROGRAMS, header + ["Notes"], [row + [""] for row in rows])
+    os.utime(PROGRAMS, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    window.file_changed(PROGRAMS)
+    window.sync_files()
+
+    # dropped, and loaded again once its tab is opened
+    assert PROGRAMS not in window.loaded
+    assert window.programsTable.source_model().rowCount() == 0
+
+def test_pending_search_and_sort_on_dashboard(window):
+    window.searchInput.setText("torres")
+    show_dashboard(window)
+
+    assert not window.searchTimer.isActive()
+    window.search_table()
+    window.sort_table()
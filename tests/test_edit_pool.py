@@ -0,0 +1,39 @@
+import os
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+import functions.store as store_module
+import functions.reference_cache as reference_cache_module
+from functions.edit import EditEntry
+from tests.conftest import ROOT
+
+STUDENTS = "data/students.csv"
+PROGRAMS = "data/programs.csv"
+
+@pytest.fixture
+def app(data_dir, monkeypatch):
+    os.symlink(os.path.join(ROOT, "ui"), "ui")
+    monkeypatch.setattr(store_module, "_store", None)
+    monkeypatch.setattr(reference_cache_module, "_cache", None)
+    monkeypatch.setattr(EditEntry, "pool", {})
+    app = QApplication.instance() or QApplication([])
+    yield app
+    for dialog in EditEntry.pool.values():
+        dialog.deleteLater()
+    store_module.get_store().writer.close()
+    app.processEvents()
+
+def codes(combo_box):
+    return [combo_box.itemText(index) for index in range(combo_box.count())]
+
+def test_reused_dialog_lists_codes_added_since(app):
+    dialog = EditEntry.acquire(STUDENTS, mode="add")
+    assert "BSXX" not in codes(dialog.programInput)
+
+    assert store_module.get_store().insert(PROGRAMS, ["BSXX", "Bachelor of Science in X", "CCS"]) is not None
+
+    assert EditEntry.acquire(STUDENTS, mode="add") is dialog
+    assert "BSXX" in codes(dialog.programInput)
+    assert dialog.programInput.currentIndex() == 0
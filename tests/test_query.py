@@ -0,0 +1,25 @@
+import pytest
+from functions.query import compile_query, QueryError
+
+STUDENTS = "data/students.csv"
+
+def named(store, key, last_name):
+    row = list(store.table(STUDENTS).get(key))
+    row[2] = last_name
+    return row
+
+@pytest.mark.parametrize("text", ["-Torres", "a:b", "x<y", 'O"Neil', '"Dela Torres'])
+def test_text_without_a_real_field_is_a_plain_search(store, text):
+    store.update(STUDENTS, "2020-1700", named(store, "2020-1700", text))
+
+    keys = compile_query(store, STUDENTS, text)()
+
+    assert keys == store.table(STUDENTS).search(text) == {"2020-1700"}
+
+def test_field_terms_still_filter(store):
+    # both Torres rows are in year 3 or above; only one is not Male
+    assert compile_query(store, STUDENTS, "year>=3 -gender=Male torres")() == {"2020-1486"}
+
+def test_ambiguous_field_is_an_error(store):
+    with pytest.raises(QueryError):
+        compile_query(store, STUDENTS, "name:juan")
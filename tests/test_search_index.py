@@ -0,0 +1,55 @@
+import threading
+import functions.store as store_module
+from functions.search_index import SearchIndex
+
+STUDENTS = "data/students.csv"
+
+def test_search_during_background_build_waits_for_it(store, monkeypatch):
+    builds = []
+    release = threading.Event()
+
+    def slow_index(*args):
+        builds.append(threading.current_thread().name)
+        release.wait()
+        return SearchIndex(*args)
+
+    monkeypatch.setattr(store_module, "SearchIndex", slow_index)
+    table = store.table(STUDENTS)
+    table.prepare_search()
+    assert not table.search_ready()
+
+    # edits made while the builder runs reach its index
+    row = list(table.get("2020-1700"))
+    row[2] = "Zamora"
+    store.update(STUDENTS, "2020-1700", row)
+    store.delete(STUDENTS, "2020-1486")
+
+    threading.Timer(0.1, release.set).start()
+    assert table.search("zamora") == {"2020-1700"}
+    assert table.search("torres") == set()
+    assert builds == [f"index {STUDENTS}"]
+    assert table.search_ready()
+
+def test_search_bar_waits_for_the_index(window):
+    table = store_module.get_store().table(STUDENTS)
+    table.search_ready = lambda: False
+    window.searchInput.setText("torres")
+    window.search_table()
+
+    assert window.studentsTable.model().matcher is None
+    assert window.searchTimer.isActive()
+
+    del table.search_ready
+    window.search_table()
+    assert window.studentsTable.model().rowCount() == 2
+
+def test_short_text_waits_for_enter(window):
+    window.searchInput.setText("to")
+    assert not window.searchTimer.isActive()
+    assert window.studentsTable.model().matcher is None
+
+    window.searchInput.returnPressed.emit()
+    assert window.studentsTable.model().matcher is not None
+
+    window.searchInput.setText("tor")
+    assert window.searchTimer.isActive()
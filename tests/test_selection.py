@@ -0,0 +1,38 @@
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QItemSelectionModel
+from PyQt6.QtGui import QColor
+
+def test_selection_survives_pointer_moving(window):
+    table = window.studentsTable
+    model = table.model()
+    flags = QItemSelectionModel.SelectionFlag.Select | QItemSelectionModel.SelectionFlag.Rows
+    for row in (1, 3, 5):
+        table.selectionModel().select(model.index(row, 0), flags)
+
+    # across another row, then onto the options button of a selected one
+    table.entered.emit(model.index(4, 0))
+    table.entered.emit(model.index(1, model.columnCount() - 1))
+
+    assert table.selected_rows() == [1, 3, 5]
+    assert table.hovered_row == 1
+
+def test_stylesheet_colours_hovered_and_selected_rows(window):
+    window.resize(1200, 800)
+    table = window.studentsTable
+    model = table.model()
+    table.hover_row(2)
+    flags = QItemSelectionModel.SelectionFlag.Select | QItemSelectionModel.SelectionFlag.Rows
+    table.selectionModel().select(model.index(5, 0), flags)
+    QApplication.processEvents()
+
+    image = table.viewport().grab().toImage()
+    def colour(row):
+        rect = table.visualRect(model.index(row, 1))
+        return image.pixelColor(rect.left() + 3, rect.center().y()).name()
+
+    assert colour(2) == QColor("lightblue").name()
+    assert colour(3) == "#ffffff"
+    # the selection is the stylesheet's lightblue, shaded a little by the style, not the platform's highlight
+    selected, expected = QColor(colour(5)), QColor("lightblue")
+    assert max(abs(selected.red() - expected.red()), abs(selected.green() - expected.green()),
+               abs(selected.blue() - expected.blue())) < 32
@@ -0,0 +1,82 @@
+import csv
+import os
+from functions.csv_operations import write_csv
+from functions.storage import CsvStorage
+from functions.store import RecordStore
+
+STUDENTS = "data/students.csv"
+KEY = "2020-1700"
+
+def read_rows(file_path):
+    with open(file_path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        return next(reader), [row for row in reader if row]
+
+def edit_outside(change):
+    # rewrites the file the way another program would, with a later mtime
+    header, rows = read_rows(STUDENTS)
+    rows = change(rows)
+    stat = os.stat(STUDENTS)
+    write_csv(STUDENTS, header, rows)
+    os.utime(STUDENTS, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def renamed(store, key, first_name):
+    row = list(store.table(STUDENTS).get(key))
+    row[1] = first_name
+    return row
+
+def test_outside_delete_wins_over_journaled_update(store):
+    assert store.update(STUDENTS, KEY, renamed(store, KEY, "Jorge")) is not None
+    store.writer.flush()
+
+    edit_outside(lambda rows: [row for row in rows if row[0] != KEY])
+    changes = store.sync(STUDENTS)
+
+    assert [(change.operation, change.key) for change in changes] == [("delete", KEY)]
+    assert KEY not in store.table(STUDENTS)
+    store.close()
+    assert KEY not in [row[0] for row in read_rows(STUDENTS)[1]]
+
+def test_outside_update_wins_over_journaled_update(store):
+    assert store.update(STUDENTS, KEY, renamed(store, KEY, "Jorge")) is not None
+    store.writer.flush()
+
+    def outside(rows):
+        return [row[:3] + ["1"] + row[4:] if row[0] == KEY else row for row in rows]
+    edit_outside(outside)
+    store.sync(STUDENTS)
+
+    row = store.table(STUDENTS).get(KEY)
+    assert (row[1], row[3]) == ("George", "1")
+    store.close()
+    assert next(row for row in read_rows(STUDENTS)[1] if row[0] == KEY)[1:4] == ["George", "Torres", "1"]
+
+def test_journaled_change_survives_outside_edit_of_other_rows(store):
+    other = list(store.table(STUDENTS).rows)[1]
+    assert store.update(STUDENTS, KEY, renamed(store, KEY, "Jorge")) is not None
+    store.writer.flush()
+
+    edit_outside(lambda rows: [row for row in rows if row[0] != other])
+    store.sync(STUDENTS)
+
+    assert store.table(STUDENTS).get(KEY)[1] == "Jorge"
+    assert other not in store.table(STUDENTS)
+    store.close()
+    rows = {row[0]: row for row in read_rows(STUDENTS)[1]}
+    assert rows[KEY][1] == "Jorge" and other not in rows
+
+def test_outside_delete_wins_after_restart_with_journal(store):
+    assert store.update(STUDENTS, KEY, renamed(store, KEY, "Jorge")) is not None
+    # stop without compacting, as if the app had quit before it got to it
+    store.writer.close()
+    assert os.path.exists(STUDENTS + ".journal")
+
+    restarted = RecordStore(CsvStorage())
+    assert restarted.table(STUDENTS).get(KEY)[1] == "Jorge"
+    edit_outside(lambda rows: [row for row in rows if row[0] != KEY])
+    restarted.sync(STUDENTS)
+
+    assert KEY not in restarted.table(STUDENTS)
+    restarted.close()
+    assert not os.path.exists(STUDENTS + ".journal")
+    assert KEY not in [row[0] for row in read_rows(STUDENTS)[1]]
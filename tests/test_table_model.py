@@ -0,0 +1,78 @@
+import os
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import Qt
+import TableModel as table_model_module
+from TableModel import TableModel, FilterProxyModel
+
+HEADER = ["ID Number", "Last Name"]
+NAMES = ["Torres", "cruz", "Lim", "Abad", "Reyes"]
+
+@pytest.fixture
+def app():
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def models(app):
+    model = TableModel()
+    proxy = FilterProxyModel()
+    proxy.setSourceModel(model)
+    model.set_rows(HEADER, [(f"2024-{row:04d}", NAMES[row * 7 % len(NAMES)]) for row in range(300)])
+    proxy.sort(1)
+    model.position("2024-0000")
+    return model, proxy
+
+def check(model, proxy):
+    for row, values in enumerate(model.rows):
+        assert model.position(values[0]) == row
+    expected = sorted(range(len(model.rows)), key=lambda row: (model.rows[row][1].casefold(), row))
+    assert [proxy.source_row(row) for row in range(proxy.rowCount())] == expected
+
+@pytest.mark.parametrize("work", [0, 10 ** 9], ids=["in one reset", "one by one"])
+def test_remove_keys_keeps_positions_and_order(models, monkeypatch, work):
+    model, proxy = models
+    monkeypatch.setattr(table_model_module, "BATCH_REMOVE_WORK", work)
+    keys = [f"2024-{row:04d}" for row in range(0, 300, 7)] + ["2024-0299", "missing"]
+
+    model.remove_keys(keys)
+
+    assert not set(keys) & {values[0] for values in model.rows}
+    check(model, proxy)
+
+def test_single_removals_keep_positions(app, models):
+    model, proxy = models
+    for key in ["2024-0150", "2024-0001", "2024-0299", "2024-0151"] + [f"2024-{row:04d}" for row in range(200, 260)]:
+        model.remove_key(key)
+        assert model.position(key) is None
+    model.append_rows([("2025-0000", "Zamora")])
+    model.update_key("2024-0002", ("2025-0001", "Abad"))
+    # edited rows move on the next pass of the event loop
+    app.processEvents()
+    check(model, proxy)
+
+def test_filter_is_matched_once_across_sorts(models):
+    model, proxy = models
+    calls = []
+
+    def matcher():
+        calls.append(len(model.rows))
+        return {values[0] for values in model.rows if values[1] != "Lim"}
+
+    proxy.set_filter(matcher)
+    proxy.sort(1, Qt.SortOrder.DescendingOrder)
+    proxy.sort(0)
+    proxy.sort(1)
+    assert len(calls) == 1
+
+    # rows coming and going keep the mask in step
+    model.remove_keys(["2024-0003", "2024-0010"])
+    model.append_rows([("2025-0000", "Zamora"), ("2025-0001", "Lim")])
+    proxy.sort(1, Qt.SortOrder.DescendingOrder)
+
+    # descending by name, equal names still in source order
+    expected = sorted((row for row, values in enumerate(model.rows) if values[1] != "Lim"),
+                      key=lambda row: (model.rows[row][1].casefold(), -row), reverse=True)
+    assert [proxy.source_row(row) for row in range(proxy.rowCount())] == expected